@@ -3,29 +3,41 @@ Flask Portfolio Application
 Simple Flask backend replacing Django
 """
 
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Blueprint, Flask, current_app, render_template, jsonify, request, send_from_directory
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from sqlalchemy.orm import joinedload, load_only, selectinload
 from datetime import datetime
+import asyncio
 import os
+import click
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
+from cache import ResponseCache
+from pagination import paginate, page_response
+from streaming import stream_query, streaming_requested
+from snapshot import Snapshot
+from config import Config
+from database import RoutingSession, add_missing_columns, engine_options, init_database
+from contact_queue import ContactQueue, QueueFull
+from ratelimit import RateLimiter
+from search import SearchIndex
+from assets import AssetPipeline
+from images import ImageService
+from metrics import Metrics
+from serializer import Serializer
+from usage import UsageIndex
+from async_db import AsyncDatabase
+from content import ContentPipeline, plain_text
+from tags import TagIndex, slugify
 
-app = Flask(__name__, 
-            template_folder='templates',
-            static_folder='static')
-app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///portfolio.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = 'static/uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-
-# Allow CORS for API
-CORS(app)
-
-# Initialize extensions
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+# Extensions, bound to an app by create_app()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+response_cache = ResponseCache()
+assets = AssetPipeline()
+images = ImageService()
+metrics = Metrics()
+async_db = AsyncDatabase(db=db)
 
 # Models
 class User(db.Model):
@@ -65,6 +77,10 @@ class Profile(db.Model):
 
 class Skill(db.Model):
     __tablename__ = 'skills'
+    __table_args__ = (
+        # Covers type filtering/grouping and the proficiency, name ordering in one index
+        db.Index('ix_skills_type_proficiency_name', 'skill_type', db.desc('proficiency'), 'name'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     skill_type = db.Column(db.String(10), nullable=False)  # tech, soft, tool, lang
@@ -84,6 +100,10 @@ class Skill(db.Model):
 
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (
+        db.Index('ix_projects_featured_created_at', 'featured', 'created_at'),
+        db.Index('ix_projects_created_at', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -95,7 +115,8 @@ class Project(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Many-to-many relationship with skills
-    technologies = db.relationship('Skill', secondary='project_skills', lazy='subquery',
+    # Loaded per route with selectinload() so routes that skip it pay nothing
+    technologies = db.relationship('Skill', secondary='project_skills', lazy='select',
                                    backref=db.backref('projects', lazy=True))
     
     def to_dict(self):
@@ -111,15 +132,23 @@ class Project(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'technologies': [tech.to_dict() for tech in self.technologies]
         }
+    
+    def search_document(self):
+        return self.title, self.description
 
 # Association table for many-to-many relationship
 project_skills = db.Table('project_skills',
     db.Column('project_id', db.Integer, db.ForeignKey('projects.id'), primary_key=True),
-    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id'), primary_key=True),
+    # The primary key serves project -> skills; this serves skill -> projects
+    db.Index('ix_project_skills_skill_project', 'skill_id', 'project_id')
 )
 
 class Experience(db.Model):
     __tablename__ = 'experiences'
+    __table_args__ = (
+        db.Index('ix_experiences_start_date', 'start_date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     company = db.Column(db.String(200), nullable=False)
@@ -130,7 +159,7 @@ class Experience(db.Model):
     description = db.Column(db.Text, nullable=False)
     
     # Many-to-many relationship with skills
-    skills_used = db.relationship('Skill', secondary='experience_skills', lazy='subquery',
+    skills_used = db.relationship('Skill', secondary='experience_skills', lazy='select',
                                  backref=db.backref('experiences', lazy=True))
     
     def to_dict(self):
@@ -145,13 +174,34 @@ class Experience(db.Model):
             'description': self.description,
             'skills_used': [skill.to_dict() for skill in self.skills_used]
         }
+    
+    def search_document(self):
+        return f'{self.title} - {self.company}', self.description
 
 # Association table for experience skills
 experience_skills = db.Table('experience_skills',
     db.Column('experience_id', db.Integer, db.ForeignKey('experiences.id'), primary_key=True),
-    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id'), primary_key=True),
+    db.Index('ix_experience_skills_skill_experience', 'skill_id', 'experience_id')
 )
 
+class SkillUsage(db.Model):
+    """Per-skill link counts, maintained by UsageIndex whenever links change"""
+    __tablename__ = 'skill_usage'
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True)
+    project_count = db.Column(db.Integer, nullable=False, default=0)
+    experience_count = db.Column(db.Integer, nullable=False, default=0)
+    last_used = db.Column(db.Date)  # newest project created_at / experience end (or start) date
+    in_use = db.Column(db.Boolean, nullable=False, default=False)  # linked to a current experience
+    
+    def to_dict(self):
+        return {
+            'project_count': self.project_count,
+            'experience_count': self.experience_count,
+            'last_used': self.last_used.isoformat() if self.last_used else None,
+            'in_use': self.in_use
+        }
+
 class Education(db.Model):
     __tablename__ = 'education'
     id = db.Column(db.Integer, primary_key=True)
@@ -179,6 +229,9 @@ class Education(db.Model):
 
 class Certification(db.Model):
     __tablename__ = 'certifications'
+    __table_args__ = (
+        db.Index('ix_certifications_issue_date', 'issue_date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     issuer = db.Column(db.String(200), nullable=False)
@@ -204,6 +257,9 @@ class Certification(db.Model):
 
 class Achievement(db.Model):
     __tablename__ = 'achievements'
+    __table_args__ = (
+        db.Index('ix_achievements_date', 'date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -224,6 +280,9 @@ class Achievement(db.Model):
             'url': self.url,
             'image': self.image
         }
+    
+    def search_document(self):
+        return self.title, ' '.join(filter(None, [self.description, self.organization]))
 
 class Contact(db.Model):
     __tablename__ = 'contacts'
@@ -248,36 +307,74 @@ class Contact(db.Model):
 
 class BlogPost(db.Model):
     __tablename__ = 'blog_posts'
+    __table_args__ = (
+        db.Index('ix_blog_posts_status_published_at', 'status', 'published_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     slug = db.Column(db.String(200), unique=True, nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    content = db.Column(db.Text, nullable=False)  # Markdown
+    content_html = db.Column(db.Text)  # rendered and sanitized on write, see content.py
     excerpt = db.Column(db.Text)
+    reading_time = db.Column(db.Integer)  # minutes
     image = db.Column(db.String(255))
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.String(10), default='draft')  # draft, published
-    tags = db.Column(db.String(200))
+    tags = db.Column(db.String(200))  # comma-separated; normalized into tags/post_tags by TagIndex
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     published_at = db.Column(db.DateTime)
     
     author = db.relationship('User', backref=db.backref('blog_posts', lazy=True))
     
+    FIELDS = ('id', 'title', 'slug', 'content', 'content_html', 'excerpt', 'reading_time', 'image',
+              'author', 'status', 'tags', 'created_at', 'updated_at', 'published_at')
+    # Listings carry the excerpt only; the body is served by /api/blog/<slug>
+    SUMMARY_FIELDS = ('id', 'title', 'slug', 'excerpt', 'reading_time', 'image', 'author',
+                      'status', 'tags', 'created_at', 'updated_at', 'published_at')
+    DETAIL_FIELDS = SUMMARY_FIELDS + ('content_html',)
+    
+    def to_dict(self, fields=None):
+        """Serialize the post (SUMMARY_FIELDS by default), touching only the requested fields
+        so deferred columns stay unloaded"""
+        data = {}
+        for field in fields or self.SUMMARY_FIELDS:
+            if field == 'author':
+                data['author'] = self.author.to_dict() if self.author else None
+            elif field in ('created_at', 'updated_at', 'published_at'):
+                value = getattr(self, field)
+                data[field] = value.isoformat() if value else None
+            else:
+                data[field] = getattr(self, field)
+        return data
+    
+    def search_document(self):
+        if self.status != 'published':
+            return None
+        # The excerpt is stored as HTML; index its text so snippets escape it only once
+        excerpt = plain_text(self.excerpt) if self.excerpt else None
+        return self.title, ' '.join(filter(None, [excerpt, self.content, self.tags]))
+
+class Tag(db.Model):
+    """A normalized blog tag; post_count (published posts) is maintained by TagIndex"""
+    __tablename__ = 'tags'
+    __table_args__ = (
+        db.Index('ix_tags_post_count', 'post_count'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    slug = db.Column(db.String(200), unique=True, nullable=False)
+    post_count = db.Column(db.Integer, nullable=False, default=0)
+    
     def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'slug': self.slug,
-            'content': self.content,
-            'excerpt': self.excerpt,
-            'image': self.image,
-            'author': self.author.to_dict() if self.author else None,
-            'status': self.status,
-            'tags': self.tags,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'published_at': self.published_at.isoformat() if self.published_at else None
-        }
+        return {'name': self.name, 'slug': self.slug, 'count': self.post_count}
+
+post_tags = db.Table('post_tags',
+    db.Column('post_id', db.Integer, db.ForeignKey('blog_posts.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key serves post -> tags; this serves tag -> posts
+    db.Index('ix_post_tags_tag_post', 'tag_id', 'post_id'),
+)
 
 # Add to_dict method to User model
 User.to_dict = lambda self: {
@@ -288,138 +385,461 @@ User.to_dict = lambda self: {
     'last_name': self.last_name
 }
 
+# Invalidate cached API responses whenever portfolio data is written
+PORTFOLIO_MODELS = (Profile, User, Skill, Project, Experience, Education,
+                    Certification, Achievement, BlogPost)
+response_cache.watch(*PORTFOLIO_MODELS)
+# Time to_dict() per request in apps with METRICS_ENABLED
+metrics.instrument(*PORTFOLIO_MODELS, Contact)
+
+# Compiled row encoders mirroring each to_dict(), used to build the portfolio snapshot
+serializer = Serializer(db=db, versions=response_cache.versions)
+serializer.register(User, exclude=('created_at',))
+serializer.register(Profile, exclude=('user_id',), one={'user': (User, 'user_id')})
+serializer.register(Skill)
+serializer.register(Project, many={'technologies': (Skill, project_skills)})
+serializer.register(Experience, many={'skills_used': (Skill, experience_skills)})
+serializer.register(Education, convert={'gpa': lambda gpa: float(gpa) if gpa else None})
+serializer.register(Certification)
+serializer.register(Achievement)
+serializer.register(BlogPost, exclude=('author_id', 'content', 'content_html'),
+                    one={'author': (User, 'author_id')})
+response_cache.watch_session(db.session)
+
+# Skill usage aggregate, recomputed for the skills touched by each flush
+skill_usage = UsageIndex(db=db, model=SkillUsage, target=Skill)
+skill_usage.track(Project.technologies, count='project_count', used=Project.created_at)
+skill_usage.track(Experience.skills_used, count='experience_count',
+                  used=db.func.coalesce(Experience.end_date, Experience.start_date),
+                  current=Experience.current)
+
+# Markdown posts rendered to sanitized HTML, excerpt and reading time on write
+blog_content = ContentPipeline(db=db, model=BlogPost)
+
+# Tags parsed from BlogPost.tags, with per-tag counts of published posts
+blog_tags = TagIndex(db=db, model=BlogPost, tag=Tag, link=post_tags,
+                     counted=BlogPost.status == 'published')
+response_cache.watch(Tag)
+
+# Full-text search over published content
+search_index = SearchIndex(db=db)
+search_index.register(BlogPost, 'blog_post', 1)
+search_index.register(Project, 'project', 2)
+search_index.register(Experience, 'experience', 3)
+search_index.register(Achievement, 'achievement', 4)
+
+# Routes, registered on the app by create_app()
+site = Blueprint('site', __name__)
+
+@site.after_app_request
+def add_conditional_headers(response):
+    """Let clients and CDNs revalidate /api/* reads with ETag / Last-Modified"""
+    if request.method == 'GET' and request.path.startswith('/api/') \
+            and response.status_code in (200, 304) and not response.is_streamed:
+        if response.status_code == 200 and not response.get_etag()[0]:
+            response.add_etag()
+            response.make_conditional(request)
+        response.cache_control.no_cache = True
+    return response
+
+# Query planning
+def requested_fields(model):
+    """Parse ?fields= / ?expand= into a field tuple, or None for the default representation
+
+    `fields` selects top-level keys; `expand` adds relationship keys on top of them.
+    """
+    fields = request.args.get('fields')
+    if fields is None:
+        return None
+    names = [f for f in fields.split(',') if f]
+    names += [f for f in request.args.get('expand', '').split(',') if f and f not in names]
+    unknown = [f for f in names if f not in model.FIELDS]
+    if unknown:
+        raise ValueError('Unknown fields: ' + ', '.join(unknown))
+    return tuple(names) or ('id',)
+
+def blog_post_options(fields=None, streaming=False):
+    """Loader options for BlogPost: defer unrequested columns, join the author only if needed
+
+    Streaming queries use selectinload instead, since joined eager loads can't be batched with yield_per.
+    """
+    author_loader = selectinload if streaming else joinedload
+    fields = fields or BlogPost.SUMMARY_FIELDS
+    # published_at is always loaded because it is the pagination key
+    columns = [getattr(BlogPost, f) for f in fields if f not in ('id', 'author', 'published_at')]
+    options = [load_only(BlogPost.published_at, *columns)]
+    if 'author' in fields:
+        options.append(author_loader(BlogPost.author))
+    return options
+
+# Batched background writer for contact form submissions
+contact_queue = ContactQueue(db=db, model=Contact)
+rate_limiter = RateLimiter()
+
+def validate_contact(data):
+    """Check a submission up front, since queued rows are written after the response"""
+    for key in ['name', 'email', 'subject', 'message']:
+        value = data[key]
+        if not isinstance(value, str) or not value.strip():
+            return f'Invalid {key}'
+        length = Contact.__table__.columns[key].type.length
+        if length and len(value) > length:
+            return f'{key} is too long'
+    return None
+
 # Routes - Frontend pages
-@app.route('/')
+def render_page():
+    """Render index.html with the portfolio snapshot inlined, so first paint needs no API call"""
+    bootstrap = None
+    if current_app.config['SSR_ENABLED']:
+        # The snapshot is already JSON; escape <, > and & so it can't close the script tag
+        bootstrap = portfolio_snapshot.body().decode('utf-8').replace('<', '\\u003c')\
+            .replace('>', '\\u003e').replace('&', '\\u0026')
+    return render_template('index.html', portfolio_bootstrap=bootstrap)
+
+@site.route('/')
+@response_cache.cached(*PORTFOLIO_MODELS)
 def index():
-    return render_template('index.html')
+    return render_page()
 
-@app.route('/about')
+@site.route('/about')
+@response_cache.cached(*PORTFOLIO_MODELS)
 def about():
-    return render_template('index.html')
+    return render_page()
 
-@app.route('/projects')
+@site.route('/projects')
+@response_cache.cached(*PORTFOLIO_MODELS)
 def projects():
-    return render_template('index.html')
+    return render_page()
 
-@app.route('/contact')
+@site.route('/contact')
+@response_cache.cached(*PORTFOLIO_MODELS)
 def contact():
-    return render_template('index.html')
+    return render_page()
 
-@app.route('/blog')
+@site.route('/blog')
+@response_cache.cached(*PORTFOLIO_MODELS)
 def blog():
-    return render_template('index.html')
+    return render_page()
 
 # API Routes
-@app.route('/api/portfolio/', methods=['GET'])
+def build_portfolio():
+    """Assemble the full portfolio document from the database"""
+    profile = Profile.query.options(joinedload(Profile.user)).first()
+    skills = Skill.query.all()
+    projects = Project.query.options(selectinload(Project.technologies))\
+        .filter_by(featured=True).all()
+    experiences = Experience.query.options(selectinload(Experience.skills_used))\
+        .order_by(Experience.start_date.desc()).all()
+    education = Education.query.order_by(Education.start_date.desc()).all()
+    certifications = Certification.query.order_by(Certification.issue_date.desc()).all()
+    achievements = Achievement.query.order_by(Achievement.date.desc()).all()
+    blog_posts = BlogPost.query.options(*blog_post_options()).filter_by(status='published')\
+        .order_by(BlogPost.published_at.desc()).limit(10).all()
+
+    return {
+        'profile': profile.to_dict() if profile else None,
+        'skills': [skill.to_dict() for skill in skills],
+        'projects': [project.to_dict() for project in projects],
+        'experiences': [exp.to_dict() for exp in experiences],
+        'education': [edu.to_dict() for edu in education],
+        'certifications': [cert.to_dict() for cert in certifications],
+        'achievements': [ach.to_dict() for ach in achievements],
+        'blog_posts': [post.to_dict() for post in blog_posts]
+    }
+
+def portfolio_sections():
+    """The Core selects behind build_portfolio(), as {key: (model, statement)}"""
+    s = serializer
+    return {
+        # Skills come first so projects and experiences reuse the encoded skill fragments
+        'skills': (Skill, s.select(Skill)),
+        'profile': (Profile, s.select(Profile).limit(1)),
+        'projects': (Project, s.select(Project).filter_by(featured=True)),
+        'experiences': (Experience, s.select(Experience).order_by(Experience.start_date.desc())),
+        'education': (Education, s.select(Education).order_by(Education.start_date.desc())),
+        'certifications': (Certification, s.select(Certification).order_by(Certification.issue_date.desc())),
+        'achievements': (Achievement, s.select(Achievement).order_by(Achievement.date.desc())),
+        'blog_posts': (BlogPost, s.select(BlogPost).filter_by(status='published')
+                       .order_by(BlogPost.published_at.desc()).limit(10)),
+    }
+
+def portfolio_document(fragments):
+    profile = fragments.pop('profile')
+    sections = {key: serializer.array(items) for key, items in fragments.items()}
+    sections['profile'] = profile[0] if profile else 'null'
+    return serializer.document(sections)
+
+def serialize_portfolio():
+    """build_portfolio() as jsonify() would encode it, straight from Core rows"""
+    if not serializer.compatible:
+        return None
+    if async_db.enabled:
+        return async_db.run(serialize_portfolio_async)
+    return portfolio_document({key: serializer.encode(model, statement)
+                               for key, (model, statement) in portfolio_sections().items()})
+
+async def serialize_portfolio_async():
+    """serialize_portfolio() with the independent queries of each round run concurrently"""
+    sections = portfolio_sections()
+    results = await asyncio.gather(*(async_db.fetch(statement) for _, statement in sections.values()))
+    rows = dict(zip(sections, results))
+    fragments = {'skills': await serializer.encode_async(Skill, rows.pop('skills'), async_db.fetch)}
+    encoded = await asyncio.gather(*(serializer.encode_async(sections[key][0], rows[key], async_db.fetch)
+                                     for key in rows))
+    fragments.update(zip(rows, encoded))
+    return portfolio_document(fragments)
+
+# Prebuilt /api/portfolio/ document, rebuilt when any of its tables change
+portfolio_snapshot = Snapshot(db=db, build=build_portfolio, cache=response_cache,
+                             models=PORTFOLIO_MODELS, serialize=serialize_portfolio)
+
+@site.route('/api/portfolio/', methods=['GET'])
 def get_portfolio():
-    """Get all portfolio data in one request"""
+    """Get all portfolio data in one request, served from the prebuilt snapshot"""
     try:
-        profile = Profile.query.first()
-        skills = Skill.query.all()
-        projects = Project.query.filter_by(featured=True).all()
-        experiences = Experience.query.order_by(Experience.start_date.desc()).all()
-        education = Education.query.order_by(Education.start_date.desc()).all()
-        certifications = Certification.query.order_by(Certification.issue_date.desc()).all()
-        achievements = Achievement.query.order_by(Achievement.date.desc()).all()
-        blog_posts = BlogPost.query.filter_by(status='published').order_by(BlogPost.published_at.desc()).limit(10).all()
-        
-        data = {
-            'profile': profile.to_dict() if profile else None,
-            'skills': [skill.to_dict() for skill in skills],
-            'projects': [project.to_dict() for project in projects],
-            'experiences': [exp.to_dict() for exp in experiences],
-            'education': [edu.to_dict() for edu in education],
-            'certifications': [cert.to_dict() for cert in certifications],
-            'achievements': [ach.to_dict() for ach in achievements],
-            'blog_posts': [post.to_dict() for post in blog_posts]
-        }
-        
-        return jsonify(data)
+        return portfolio_snapshot.response()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/profiles/', methods=['GET'])
+@site.route('/api/profiles/', methods=['GET'])
+@response_cache.cached(Profile, User)
 def get_profiles():
     """Get all profiles"""
-    profiles = Profile.query.all()
+    profiles = Profile.query.options(joinedload(Profile.user)).all()
     return jsonify([p.to_dict() for p in profiles])
 
-@app.route('/api/skills/', methods=['GET'])
+@site.route('/api/skills/', methods=['GET'])
+@response_cache.cached(Skill, Project, Experience, SkillUsage)
 def get_skills():
-    """Get all skills, optionally filtered by type"""
+    """Get all skills, optionally filtered by type; ?sort=usage orders by project + experience count"""
     skill_type = request.args.get('type')
+    if request.args.get('sort') == 'usage':
+        total = db.func.coalesce(SkillUsage.project_count, 0) + db.func.coalesce(SkillUsage.experience_count, 0)
+        query = db.session.query(Skill, SkillUsage).outerjoin(SkillUsage, SkillUsage.skill_id == Skill.id)
+        if skill_type:
+            query = query.filter(Skill.skill_type == skill_type)
+        rows = query.order_by(total.desc(), Skill.name).all()
+        return jsonify([dict(skill.to_dict(), usage=usage_dict(usage)) for skill, usage in rows])
     query = Skill.query
     if skill_type:
         query = query.filter_by(skill_type=skill_type)
     skills = query.order_by(Skill.proficiency.desc(), Skill.name).all()
     return jsonify([s.to_dict() for s in skills])
 
-@app.route('/api/skills/grouped/', methods=['GET'])
+def usage_dict(usage):
+    if usage is None:
+        return {'project_count': 0, 'experience_count': 0, 'last_used': None, 'in_use': False}
+    return usage.to_dict()
+
+@site.route('/api/skills/<int:skill_id>/usage', methods=['GET'])
+@response_cache.cached(Skill, Project, Experience, SkillUsage)
+def get_skill_usage(skill_id):
+    """Usage counts for one skill and the projects/experiences that use it"""
+    row = db.session.query(Skill, SkillUsage).outerjoin(SkillUsage, SkillUsage.skill_id == Skill.id)\
+        .filter(Skill.id == skill_id).first()
+    if row is None:
+        return jsonify({'error': 'Skill not found'}), 404
+    skill, usage = row
+    projects = db.session.query(Project.id, Project.title)\
+        .join(project_skills, project_skills.c.project_id == Project.id)\
+        .filter(project_skills.c.skill_id == skill_id)\
+        .order_by(Project.created_at.desc()).all()
+    experiences = db.session.query(Experience.id, Experience.title, Experience.company)\
+        .join(experience_skills, experience_skills.c.experience_id == Experience.id)\
+        .filter(experience_skills.c.skill_id == skill_id)\
+        .order_by(Experience.start_date.desc()).all()
+    return jsonify(dict(usage_dict(usage),
+                        skill=skill.to_dict(),
+                        projects=[{'id': p.id, 'title': p.title} for p in projects],
+                        experiences=[{'id': e.id, 'title': e.title, 'company': e.company}
+                                     for e in experiences]))
+
+SKILL_GROUPS = {'tech': 'technical', 'soft': 'soft_skills', 'tool': 'tools', 'lang': 'languages'}
+
+@site.route('/api/skills/grouped/', methods=['GET'])
+@response_cache.cached(Skill)
 def get_skills_grouped():
-    """Get skills grouped by type"""
-    tech_skills = Skill.query.filter_by(skill_type='tech').all()
-    soft_skills = Skill.query.filter_by(skill_type='soft').all()
-    tools = Skill.query.filter_by(skill_type='tool').all()
-    languages = Skill.query.filter_by(skill_type='lang').all()
-    
-    data = {
-        'technical': [s.to_dict() for s in tech_skills],
-        'soft_skills': [s.to_dict() for s in soft_skills],
-        'tools': [s.to_dict() for s in tools],
-        'languages': [s.to_dict() for s in languages]
-    }
+    """Get skills grouped by type; types without a named group are keyed by the type itself"""
+    data = {group: [] for group in SKILL_GROUPS.values()}
+    # One pass over the (skill_type, proficiency DESC, name) index
+    for skill in Skill.query.order_by(Skill.skill_type, Skill.proficiency.desc(), Skill.name):
+        data.setdefault(SKILL_GROUPS.get(skill.skill_type, skill.skill_type), []).append(skill.to_dict())
     return jsonify(data)
 
-@app.route('/api/projects/', methods=['GET'])
+@site.route('/api/projects/', methods=['GET'])
+@response_cache.cached(Project, Skill)
 def get_projects():
-    """Get all projects, optionally filtered by featured"""
+    """Get projects newest first, optionally filtered by featured
+
+    Paged with ?cursor= / ?limit=, or streamed in full with ?stream=1 / Accept: application/x-ndjson.
+    """
     featured = request.args.get('featured')
-    query = Project.query
+    query = Project.query.options(selectinload(Project.technologies))
     if featured:
         query = query.filter_by(featured=(featured.lower() == 'true'))
-    projects = query.order_by(Project.created_at.desc()).all()
-    return jsonify([p.to_dict() for p in projects])
+    if streaming_requested():
+        return stream_query(query.order_by(Project.created_at.desc().nulls_last(), Project.id.desc()),
+                            Project.to_dict)
+    try:
+        projects, next_cursor = paginate(query, Project.created_at, Project.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response([p.to_dict() for p in projects], next_cursor)
 
-@app.route('/api/experiences/', methods=['GET'])
+@site.route('/api/experiences/', methods=['GET'])
+@response_cache.cached(Experience, Skill)
 def get_experiences():
-    """Get all experiences"""
-    experiences = Experience.query.order_by(Experience.start_date.desc()).all()
-    return jsonify([e.to_dict() for e in experiences])
+    """Get experiences, most recent first; paged with ?cursor= / ?limit="""
+    query = Experience.query.options(selectinload(Experience.skills_used))
+    try:
+        experiences, next_cursor = paginate(query, Experience.start_date, Experience.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response([e.to_dict() for e in experiences], next_cursor)
 
-@app.route('/api/education/', methods=['GET'])
+@site.route('/api/education/', methods=['GET'])
+@response_cache.cached(Education)
 def get_education():
     """Get all education"""
     education = Education.query.order_by(Education.start_date.desc()).all()
     return jsonify([e.to_dict() for e in education])
 
-@app.route('/api/certifications/', methods=['GET'])
+@site.route('/api/certifications/', methods=['GET'])
+@response_cache.cached(Certification)
 def get_certifications():
-    """Get all certifications"""
-    certifications = Certification.query.order_by(Certification.issue_date.desc()).all()
-    return jsonify([c.to_dict() for c in certifications])
+    """Get certifications, most recent first; paged with ?cursor= / ?limit="""
+    try:
+        certifications, next_cursor = paginate(Certification.query, Certification.issue_date,
+                                               Certification.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response([c.to_dict() for c in certifications], next_cursor)
 
-@app.route('/api/achievements/', methods=['GET'])
+@site.route('/api/achievements/', methods=['GET'])
+@response_cache.cached(Achievement)
 def get_achievements():
-    """Get all achievements"""
-    achievements = Achievement.query.order_by(Achievement.date.desc()).all()
-    return jsonify([a.to_dict() for a in achievements])
+    """Get achievements, most recent first; paged with ?cursor= / ?limit="""
+    try:
+        achievements, next_cursor = paginate(Achievement.query, Achievement.date, Achievement.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response([a.to_dict() for a in achievements], next_cursor)
 
-@app.route('/api/blog/', methods=['GET'])
+@site.route('/api/blog/', methods=['GET'])
+@response_cache.cached(BlogPost, User, Tag)
 def get_blog_posts():
-    """Get all published blog posts"""
-    posts = BlogPost.query.filter_by(status='published')\
-        .order_by(BlogPost.published_at.desc()).all()
-    return jsonify([p.to_dict() for p in posts])
+    """Get published blog posts newest first, optionally projected with ?fields= / ?expand=
+
+    Paged with ?cursor= / ?limit=, or streamed in full with ?stream=1 / Accept: application/x-ndjson.
+    ?tag= keeps the posts carrying that tag (matched by slug).
+    """
+    try:
+        fields = requested_fields(BlogPost)
+        streaming = streaming_requested()
+        query = BlogPost.query.options(*blog_post_options(fields, streaming=streaming))\
+            .filter_by(status='published')
+        tag = request.args.get('tag')
+        if tag:
+            query = query.filter(BlogPost.id.in_(
+                db.select(post_tags.c.post_id).join(Tag, Tag.id == post_tags.c.tag_id)
+                .where(Tag.slug == slugify(tag))))
+        if streaming:
+            query = query.order_by(BlogPost.published_at.desc().nulls_last(), BlogPost.id.desc())
+            return stream_query(query, lambda post: post.to_dict(fields))
+        posts, next_cursor = paginate(query, BlogPost.published_at, BlogPost.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response([p.to_dict(fields) for p in posts], next_cursor)
+
+@site.route('/api/blog/<slug>', methods=['GET'])
+@response_cache.cached(BlogPost, User)
+def get_blog_post(slug):
+    """Get one published post with its pre-rendered HTML body, optionally projected with ?fields="""
+    try:
+        fields = requested_fields(BlogPost) or BlogPost.DETAIL_FIELDS
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    post = BlogPost.query.options(*blog_post_options(fields))\
+        .filter_by(slug=slug, status='published').first()
+    if post is None:
+        return jsonify({'error': 'Post not found'}), 404
+    return jsonify(post.to_dict(fields))
+
+@site.route('/api/tags/', methods=['GET'])
+@response_cache.cached(Tag, BlogPost)
+def get_tags():
+    """Get tags used by published posts with their post counts, most used first"""
+    tags = Tag.query.filter(Tag.post_count > 0).order_by(Tag.post_count.desc(), Tag.name).all()
+    return jsonify([tag.to_dict() for tag in tags])
+
+@site.route('/api/search/', methods=['GET'])
+@response_cache.cached(BlogPost, Project, Experience, Achievement)
+def search():
+    """Full-text search over blog posts, projects, experiences and achievements
 
-@app.route('/api/contact/', methods=['POST'])
+    ?q= terms (last one prefix-matched), optional ?type=blog_post,project and ?limit=.
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'Missing query parameter q'}), 400
+    kinds = [k for k in request.args.get('type', '').split(',') if k]
+    unknown = [k for k in kinds if k not in search_index.models]
+    if unknown:
+        return jsonify({'error': 'Unknown types: ' + ', '.join(unknown)}), 400
+    try:
+        limit = min(int(request.args.get('limit', 20)), current_app.config['API_MAX_PAGE_SIZE'])
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    return jsonify({'query': q, 'results': search_index.search(q, kinds, max(limit, 1))})
+
+@site.route('/api/cache/', methods=['GET'])
+def get_cache_stats():
+    """Get response cache hit/miss counters"""
+    return jsonify(response_cache.stats())
+
+@site.route('/api/contact/', methods=['POST'])
+@rate_limiter.limit('contact', 'RATELIMIT_CONTACT_PER_IP', 'RATELIMIT_CONTACT_GLOBAL')
 def submit_contact():
-    """Handle contact form submission"""
+    """Handle contact form submission
+
+    With CONTACT_QUEUE_ENABLED the row is queued for a batched background write
+    and the request answers 202 (429 when the queue is full). Submissions are
+    throttled per client and overall, and identical resubmissions within
+    CONTACT_DEDUP_WINDOW are rejected with 409 before any DB work.
+    """
+    dedup_key = None
     try:
         data = request.get_json()
         
         if not all(key in data for key in ['name', 'email', 'subject', 'message']):
             return jsonify({'error': 'Missing required fields'}), 400
         
+        error = validate_contact(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        dedup_key = rate_limiter.first_seen(
+            'contact', [data['name'], data['email'], data['subject'], data['message']],
+            current_app.config['CONTACT_DEDUP_WINDOW'])
+        if dedup_key is None:
+            return jsonify({'error': 'Duplicate message'}), 409
+        
+        if contact_queue.enabled:
+            try:
+                contact_queue.submit({
+                    'name': data['name'],
+                    'email': data['email'],
+                    'subject': data['subject'],
+                    'message': data['message'],
+                    'created_at': datetime.utcnow(),
+                    'read': False
+                })
+            except QueueFull:
+                rate_limiter.forget(dedup_key)
+                return jsonify({'error': 'Too many messages, please try again later'}), 429
+            return jsonify({'message': 'Message sent successfully!'}), 202
+        
         contact = Contact(
             name=data['name'],
             email=data['email'],
@@ -433,154 +853,255 @@ def submit_contact():
         return jsonify({'message': 'Message sent successfully!'}), 201
     except Exception as e:
         db.session.rollback()
+        # Nothing was stored, so a retry of the same message isn't a duplicate
+        if dedup_key is not None:
+            rate_limiter.forget(dedup_key)
         return jsonify({'error': str(e)}), 400
 
 # Initialize database
-def init_db():
-    """Initialize database tables and add sample data"""
-    with app.app_context():
-        db.create_all()
+def setup_database():
+    """Create missing tables, columns and indexes and backfill derived data"""
+    db.create_all()
+    # Columns added to tables that already existed, for the same reason as the indexes below
+    add_missing_columns(db.engine, db.metadata)
+    
+    # Create the full-text index and backfill it from existing rows; compared row by row, as
+    # writes made before this ran may have created the index holding only their own documents
+    if search_index.available(db.session.connection()):
+        search_index.backfill()
+        db.session.commit()
+    
+    # Indexes added to tables that already existed; create_all() only builds new tables
+    # (deployments managed with `flask db upgrade` get them from migrations/)
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    
+    # Render posts stored before the content pipeline existed
+    if blog_content.render_all(missing_only=True):
+        db.session.commit()
+    
+    # Link tags of posts stored before the tags table existed
+    if Tag.query.first() is None and BlogPost.query.filter(BlogPost.tags.isnot(None)).first() is not None:
+        blog_tags.rebuild()
+        db.session.commit()
+    
+    # Backfill the skill usage aggregate on databases created before it existed
+    if SkillUsage.query.first() is None and Skill.query.first() is not None:
+        skill_usage.rebuild()
+
+def seed_sample_data():
+    """Add the sample user, profile, skills, experiences and education if they are missing"""
+    # Check if data already exists
+    user = User.query.first()
+    if user is None:
+        # Create a user
+        user = User(
+            username='tuananh',
+            email='tuananh@example.com',
+            first_name='Tuan',
+            last_name='Anh'
+        )
+        db.session.add(user)
+        db.session.flush()
+        
+        # Create profile
+        profile = Profile(
+            user_id=user.id,
+            bio='Kỹ sư an toàn thông tin với niềm đam mê bảo mật ứng dụng web và cloud security.',
+            location='Việt Nam',
+            website='https://github.com/Tuan-Anh-IT'
+        )
+        db.session.add(profile)
+    else:
+        profile = Profile.query.filter_by(user_id=user.id).first()
+    
+    # Always add skills if they don't exist
+    if Skill.query.count() == 0:
+        # Create experiences first (needed for linking)
+        exp1 = Experience(
+            title='AppSec Engineer',
+            company='Công ty ABC',
+            location='Hà Nội, Việt Nam',
+            start_date=datetime(2023, 1, 1).date(),
+            end_date=datetime(2024, 12, 31).date(),
+            current=False,
+            description='Thực hiện penetration testing cho các ứng dụng web và mobile. Phát triển các tool tự động hóa quét lỗ hổng bảo mật. Tham gia thiết kế và triển khai các biện pháp bảo mật cho hệ thống cloud.'
+        )
+        db.session.add(exp1)
+        
+        exp2 = Experience(
+            title='Security Intern',
+            company='Công ty XYZ',
+            location='Hồ Chí Minh, Việt Nam',
+            start_date=datetime(2022, 6, 1).date(),
+            end_date=datetime(2022, 12, 31).date(),
+            current=False,
+            description='Hỗ trợ team bảo mật trong việc phân tích malware và điều tra sự cố an ninh. Học hỏi và áp dụng các kỹ thuật bảo mật mới nhất.'
+        )
+        db.session.add(exp2)
+        
+        db.session.flush()
+        
+        # Create skills (Tech Stack)
+        skill1 = Skill(name='Python', skill_type='tech', icon='🐍', proficiency=85)
+        skill2 = Skill(name='React', skill_type='tech', icon='⚛️', proficiency=75)
+        skill3 = Skill(name='Node.js', skill_type='tech', icon='🟢', proficiency=80)
+        skill4 = Skill(name='Flask', skill_type='tech', icon='🌶️', proficiency=85)
+        skill5 = Skill(name='HTML5', skill_type='tech', icon='📄', proficiency=90)
+        skill6 = Skill(name='CSS3', skill_type='tech', icon='🎨', proficiency=85)
+        skill7 = Skill(name='JavaScript', skill_type='tech', icon='📜', proficiency=80)
+        skill8 = Skill(name='TypeScript', skill_type='tech', icon='📘', proficiency=75)
+        skill9 = Skill(name='Penetration Testing', skill_type='tech', icon='🔒', proficiency=85)
+        skill10 = Skill(name='Web Security', skill_type='tech', icon='🛡️', proficiency=90)
+        skill11 = Skill(name='Cloud Security', skill_type='tech', icon='☁️', proficiency=80)
+        skill12 = Skill(name='SQL', skill_type='tech', icon='💾', proficiency=75)
+        
+        # Create skills (Tools)
+        skill13 = Skill(name='Burp Suite', skill_type='tool', icon='🛠️', proficiency=90)
+        skill14 = Skill(name='Nmap', skill_type='tool', icon='🔍', proficiency=85)
+        skill15 = Skill(name='Wireshark', skill_type='tool', icon='📡', proficiency=80)
+        skill16 = Skill(name='Metasploit', skill_type='tool', icon='💣', proficiency=75)
+        skill17 = Skill(name='Kali Linux', skill_type='tool', icon='🐉', proficiency=85)
+        skill18 = Skill(name='Grafana', skill_type='tool', icon='📊', proficiency=70)
+        skill19 = Skill(name='Git', skill_type='tool', icon='🔀', proficiency=85)
+        skill20 = Skill(name='Docker', skill_type='tool', icon='🐳', proficiency=75)
+        skill21 = Skill(name='AWS', skill_type='tool', icon='☁️', proficiency=80)
+        skill22 = Skill(name='Jenkins', skill_type='tool', icon='🤖', proficiency=70)
+        
+        db.session.add_all([skill1, skill2, skill3, skill4, skill5, skill6, skill7, skill8, skill9, skill10,
+                           skill11, skill12, skill13, skill14, skill15, skill16, skill17, skill18, skill19,
+                           skill20, skill21, skill22])
+        db.session.flush()
+        
+        # Link skills to experiences
+        exp1.skills_used.append(skill1)
+        exp1.skills_used.append(skill9)
+        exp1.skills_used.append(skill10)
+        exp1.skills_used.append(skill11)
+        exp1.skills_used.append(skill13)
+        exp1.skills_used.append(skill14)
+        exp1.skills_used.append(skill21)
+        
+        exp2.skills_used.append(skill1)
+        exp2.skills_used.append(skill14)
+        exp2.skills_used.append(skill15)
+        exp2.skills_used.append(skill16)
+        exp2.skills_used.append(skill17)
+        
+        # Create education
+        edu1 = Education(
+            degree='Cử nhân An toàn Thông tin',
+            institution='Đại học Bách Khoa Hà Nội',
+            field_of_study='An toàn Thông tin',
+            start_date=datetime(2019, 9, 1).date(),
+            end_date=datetime(2023, 6, 30).date(),
+            current=False,
+            description='Tốt nghiệp với GPA 3.5/4.0. Chuyên ngành An toàn Thông tin, tập trung vào bảo mật ứng dụng web, penetration testing và incident response.',
+            gpa=3.5
+        )
+        db.session.add(edu1)
         
-        # Check if data already exists
-        user = User.query.first()
-        if user is None:
-            # Create a user
-            user = User(
-                username='tuananh',
-                email='tuananh@example.com',
-                first_name='Tuan',
-                last_name='Anh'
-            )
-            db.session.add(user)
-            db.session.flush()
-            
-            # Create profile
-            profile = Profile(
-                user_id=user.id,
-                bio='Kỹ sư an toàn thông tin với niềm đam mê bảo mật ứng dụng web và cloud security.',
-                location='Việt Nam',
-                website='https://github.com/Tuan-Anh-IT'
-            )
-            db.session.add(profile)
-        else:
-            profile = Profile.query.filter_by(user_id=user.id).first()
+        edu2 = Education(
+            degree='Chứng chỉ CCNA Security',
+            institution='Cisco Networking Academy',
+            field_of_study='Network Security',
+            start_date=datetime(2022, 1, 1).date(),
+            end_date=datetime(2022, 6, 30).date(),
+            current=False,
+            description='Hoàn thành khóa học CCNA Security với chứng nhận từ Cisco Networking Academy. Tập trung vào bảo mật mạng và firewall configuration.'
+        )
+        db.session.add(edu2)
         
-        # Always add skills if they don't exist
-        if Skill.query.count() == 0:
-            # Create experiences first (needed for linking)
-            exp1 = Experience(
-                title='AppSec Engineer',
-                company='Công ty ABC',
-                location='Hà Nội, Việt Nam',
-                start_date=datetime(2023, 1, 1).date(),
-                end_date=datetime(2024, 12, 31).date(),
-                current=False,
-                description='Thực hiện penetration testing cho các ứng dụng web và mobile. Phát triển các tool tự động hóa quét lỗ hổng bảo mật. Tham gia thiết kế và triển khai các biện pháp bảo mật cho hệ thống cloud.'
-            )
-            db.session.add(exp1)
-            
-            exp2 = Experience(
-                title='Security Intern',
-                company='Công ty XYZ',
-                location='Hồ Chí Minh, Việt Nam',
-                start_date=datetime(2022, 6, 1).date(),
-                end_date=datetime(2022, 12, 31).date(),
-                current=False,
-                description='Hỗ trợ team bảo mật trong việc phân tích malware và điều tra sự cố an ninh. Học hỏi và áp dụng các kỹ thuật bảo mật mới nhất.'
-            )
-            db.session.add(exp2)
-            
-            db.session.flush()
-            
-            # Create skills (Tech Stack)
-            skill1 = Skill(name='Python', skill_type='tech', icon='🐍', proficiency=85)
-            skill2 = Skill(name='React', skill_type='tech', icon='⚛️', proficiency=75)
-            skill3 = Skill(name='Node.js', skill_type='tech', icon='🟢', proficiency=80)
-            skill4 = Skill(name='Flask', skill_type='tech', icon='🌶️', proficiency=85)
-            skill5 = Skill(name='HTML5', skill_type='tech', icon='📄', proficiency=90)
-            skill6 = Skill(name='CSS3', skill_type='tech', icon='🎨', proficiency=85)
-            skill7 = Skill(name='JavaScript', skill_type='tech', icon='📜', proficiency=80)
-            skill8 = Skill(name='TypeScript', skill_type='tech', icon='📘', proficiency=75)
-            skill9 = Skill(name='Penetration Testing', skill_type='tech', icon='🔒', proficiency=85)
-            skill10 = Skill(name='Web Security', skill_type='tech', icon='🛡️', proficiency=90)
-            skill11 = Skill(name='Cloud Security', skill_type='tech', icon='☁️', proficiency=80)
-            skill12 = Skill(name='SQL', skill_type='tech', icon='💾', proficiency=75)
-            
-            # Create skills (Tools)
-            skill13 = Skill(name='Burp Suite', skill_type='tool', icon='🛠️', proficiency=90)
-            skill14 = Skill(name='Nmap', skill_type='tool', icon='🔍', proficiency=85)
-            skill15 = Skill(name='Wireshark', skill_type='tool', icon='📡', proficiency=80)
-            skill16 = Skill(name='Metasploit', skill_type='tool', icon='💣', proficiency=75)
-            skill17 = Skill(name='Kali Linux', skill_type='tool', icon='🐉', proficiency=85)
-            skill18 = Skill(name='Grafana', skill_type='tool', icon='📊', proficiency=70)
-            skill19 = Skill(name='Git', skill_type='tool', icon='🔀', proficiency=85)
-            skill20 = Skill(name='Docker', skill_type='tool', icon='🐳', proficiency=75)
-            skill21 = Skill(name='AWS', skill_type='tool', icon='☁️', proficiency=80)
-            skill22 = Skill(name='Jenkins', skill_type='tool', icon='🤖', proficiency=70)
-            
-            db.session.add_all([skill1, skill2, skill3, skill4, skill5, skill6, skill7, skill8, skill9, skill10,
-                               skill11, skill12, skill13, skill14, skill15, skill16, skill17, skill18, skill19,
-                               skill20, skill21, skill22])
-            db.session.flush()
-            
-            # Link skills to experiences
-            exp1.skills_used.append(skill1)
-            exp1.skills_used.append(skill9)
-            exp1.skills_used.append(skill10)
-            exp1.skills_used.append(skill11)
-            exp1.skills_used.append(skill13)
-            exp1.skills_used.append(skill14)
-            exp1.skills_used.append(skill21)
-            
-            exp2.skills_used.append(skill1)
-            exp2.skills_used.append(skill14)
-            exp2.skills_used.append(skill15)
-            exp2.skills_used.append(skill16)
-            exp2.skills_used.append(skill17)
-            
-            # Create education
-            edu1 = Education(
-                degree='Cử nhân An toàn Thông tin',
-                institution='Đại học Bách Khoa Hà Nội',
-                field_of_study='An toàn Thông tin',
-                start_date=datetime(2019, 9, 1).date(),
-                end_date=datetime(2023, 6, 30).date(),
-                current=False,
-                description='Tốt nghiệp với GPA 3.5/4.0. Chuyên ngành An toàn Thông tin, tập trung vào bảo mật ứng dụng web, penetration testing và incident response.',
-                gpa=3.5
-            )
-            db.session.add(edu1)
-            
-            edu2 = Education(
-                degree='Chứng chỉ CCNA Security',
-                institution='Cisco Networking Academy',
-                field_of_study='Network Security',
-                start_date=datetime(2022, 1, 1).date(),
-                end_date=datetime(2022, 6, 30).date(),
-                current=False,
-                description='Hoàn thành khóa học CCNA Security với chứng nhận từ Cisco Networking Academy. Tập trung vào bảo mật mạng và firewall configuration.'
-            )
-            db.session.add(edu2)
-            
-            edu3 = Education(
-                degree='Khóa học Ethical Hacking',
-                institution='Cybrary',
-                field_of_study='Penetration Testing',
-                start_date=datetime(2023, 3, 1).date(),
-                end_date=datetime(2023, 8, 31).date(),
-                current=False,
-                description='Hoàn thành khóa học Ethical Hacking nâng cao, bao gồm web application penetration testing, network penetration testing và exploit development.'
-            )
-            db.session.add(edu3)
-            
-            db.session.commit()
-            return  # Skills and related data added, exit early
+        edu3 = Education(
+            degree='Khóa học Ethical Hacking',
+            institution='Cybrary',
+            field_of_study='Penetration Testing',
+            start_date=datetime(2023, 3, 1).date(),
+            end_date=datetime(2023, 8, 31).date(),
+            current=False,
+            description='Hoàn thành khóa học Ethical Hacking nâng cao, bao gồm web application penetration testing, network penetration testing và exploit development.'
+        )
+        db.session.add(edu3)
         
-        # If we reach here, data already exists - skills were already added
-        return
+        db.session.commit()
+        return  # Skills and related data added, exit early
+    
+    # If we reach here, data already exists - skills were already added
+    return
+
+def init_db():
+    """Initialize database tables and add sample data"""
+    with get_app().app_context():
+        setup_database()
+        seed_sample_data()
+
+@click.command('seed')
+def seed_command():
+    """Create missing tables and indexes, backfill derived data and add the sample data."""
+    setup_database()
+    seed_sample_data()
+    click.echo('Database initialized')
+
+# Application factory
+def create_app(config=Config):
+    """Build an app and bind the extensions; models and routes are defined at import
+
+    Nothing here touches the database: schema setup and sample data are `flask seed`.
+    """
+    app = Flask(__name__, 
+                template_folder='templates',
+                static_folder='static')
+    app.config.from_object(config)
+    engine_options(app)
+    if app.config['TRUSTED_PROXY_HOPS']:
+        # request.remote_addr becomes the client address the trusted proxies forwarded
+        hops = app.config['TRUSTED_PROXY_HOPS']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+    
+    # Allow CORS for API
+    CORS(app)
+    
+    db.init_app(app)
+    init_database(app, db)
+    if click.get_current_context(silent=True) is not None:
+        # Only `flask db ...` needs Alembic, so servers skip importing it
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    response_cache.init_app(app)
+    assets.init_app(app)
+    images.init_app(app)
+    metrics.init_app(app, db=db)
+    async_db.init_app(app)
+    serializer.init_app(app)
+    skill_usage.init_app(app)
+    blog_content.init_app(app)
+    blog_tags.init_app(app)
+    search_index.init_app(app)
+    contact_queue.init_app(app)
+    rate_limiter.init_app(app)
+    portfolio_snapshot.init_app(app)
+    app.register_blueprint(site)
+    app.cli.add_command(seed_command)
+    return app
+
+_app = None
+
+def get_app():
+    """The default app, built on first use"""
+    global _app
+    if _app is None:
+        _app = create_app()
+    return _app
+
+def __getattr__(name):
+    # `app` (flask --app app, gunicorn app:app, asgi.py) builds the default app when first
+    # accessed, so importing the models alone doesn't set up extensions
+    if name == 'app':
+        return get_app()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 # Run the app
 if __name__ == '__main__':
-    init_db()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    get_app().run(debug=True, host='0.0.0.0', port=5000)
 
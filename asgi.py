@@ -0,0 +1,26 @@
+"""
+ASGI entry point
+Serves the app from an ASGI server, running Flask views on a thread pool; set ASYNC_QUERIES=True
+to build the portfolio snapshot with concurrent queries on the async engine (see async_db.py)
+
+Usage: flask --app app seed                          (once: tables, indexes, sample data)
+       python asgi.py                                  (uvicorn, WEB_CONCURRENCY workers)
+       uvicorn asgi:application --workers 4 --host 0.0.0.0 --port 5000
+"""
+
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import app
+
+application = WSGIMiddleware(app, workers=app.config['ASGI_THREADS'])
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run('asgi:application', host=os.environ.get('HOST', '0.0.0.0'),
+                port=int(os.environ.get('PORT', 5000)),
+                workers=int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1)),
+                log_level='warning')
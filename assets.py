@@ -0,0 +1,149 @@
+"""
+Static asset pipeline
+Builds minified, content-hashed, precompressed copies of the CSS/JS bundles and
+serves them with immutable caching
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # Optional - only needed for .br variants
+    brotli = None
+
+try:
+    import rcssmin
+    import rjsmin
+except ImportError:  # Optional - fall back to the conservative minifiers below
+    rcssmin = rjsmin = None
+
+BUNDLES = ('css/style.css', 'js/app.js')
+DIST = 'dist'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def minify_css(source):
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    return re.sub(r'\s*([{};,])\s*', r'\1', source).replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """Drop indentation, blank lines and whole-line // comments outside template literals
+
+    Newlines are kept, so automatic semicolon insertion behaves exactly as before.
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                lines.append(stripped)
+        if (line.count('`') - line.count('\\`')) % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+class AssetPipeline:
+    def __init__(self, app=None):
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        self.manifest_path = os.path.join(app.static_folder, DIST, 'manifest.json')
+        self.load()
+        app.extensions['assets'] = self
+        app.add_template_global(self.url, 'asset_url')
+        app.add_url_rule(f'{app.static_url_path}/{DIST}/<path:filename>', 'dist', self.serve_dist)
+        app.cli.add_command(assets_cli)
+
+    def load(self):
+        try:
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def url(self, filename):
+        """URL of the fingerprinted build of `filename`, or the source file if not built"""
+        return url_for('static', filename=self.manifest.get(filename, filename))
+
+    def build(self):
+        """Minify, fingerprint and precompress every bundle; write the manifest"""
+        dist = os.path.join(self.static_folder, DIST)
+        manifest = {}
+        for filename in BUNDLES:
+            root, ext = os.path.splitext(filename)
+            with open(os.path.join(self.static_folder, filename), encoding='utf-8') as f:
+                data = MINIFIERS[ext](f.read()).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            target = f'{DIST}/{root}.{digest}{ext}'
+            path = os.path.join(self.static_folder, target)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            variants = {'': data, '.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data)
+            for suffix, content in variants.items():
+                with open(path + suffix, 'wb') as f:
+                    f.write(content)
+            manifest[filename] = target
+        os.makedirs(dist, exist_ok=True)
+        with open(self.manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        self.manifest = manifest
+        return manifest
+
+    def serve_dist(self, filename):
+        """Serve a built asset, picking the .br/.gz variant the client accepts"""
+        directory = os.path.join(self.static_folder, DIST)
+        encoding = None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in request.accept_encodings and \
+                    os.path.isfile(os.path.join(directory, filename + suffix)):
+                encoding = candidate
+                break
+        if encoding is None:
+            response = send_from_directory(directory, filename)
+        else:
+            response = send_from_directory(directory, filename + suffix,
+                                           mimetype=_mimetype(filename))
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+
+def _mimetype(filename):
+    return {'.css': 'text/css', '.js': 'text/javascript'}.get(os.path.splitext(filename)[1])
+
+
+@click.group('assets')
+def assets_cli():
+    """Build static asset bundles."""
+
+
+@assets_cli.command('build')
+def build_command():
+    """Minify, fingerprint and precompress CSS/JS into static/dist."""
+    manifest = current_app.extensions['assets'].build()
+    for source, target in manifest.items():
+        click.echo(f'{source} -> {target}')
@@ -0,0 +1,99 @@
+"""
+Async database access
+An async SQLAlchemy engine (aiosqlite / asyncpg) for running independent read queries
+concurrently, each on its own pooled connection
+"""
+
+import asyncio
+import os
+import threading
+from importlib.util import find_spec
+from weakref import WeakKeyDictionary
+
+from flask import current_app
+from sqlalchemy import event
+
+from database import READ_BIND, _in_memory, _sqlite_pragmas
+
+HAS_GREENLET = find_spec('greenlet') is not None
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg', 'mysql': 'mysql+aiomysql'}
+
+
+def async_url(url):
+    """sqlite:///x.db -> sqlite+aiosqlite:///x.db, postgresql://... -> postgresql+asyncpg://..."""
+    scheme, _, rest = url.partition('://')
+    return f'{ASYNC_DRIVERS.get(scheme.split("+")[0], scheme)}://{rest}'
+
+
+class AsyncDatabase:
+    def __init__(self, app=None, db=None):
+        self.db = db
+        self._engines = WeakKeyDictionary()  # app -> async engine, like db.engines per app
+        self._loop = None
+        self._loop_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ASYNC_QUERIES', False)
+        app.extensions['async_db'] = self
+
+    @property
+    def enabled(self):
+        # Optional - sqlalchemy.ext.asyncio needs greenlet, imported only when first used.
+        # Every connection to an in-memory database is a different, empty database
+        config = current_app.config
+        return config['ASYNC_QUERIES'] and HAS_GREENLET and not _in_memory(config['SQLALCHEMY_DATABASE_URI'])
+
+    @property
+    def url(self):
+        """ASYNC_DATABASE_URL, else the read (or primary) engine's resolved URL with an async driver"""
+        if current_app.config.get('ASYNC_DATABASE_URL'):
+            return current_app.config['ASYNC_DATABASE_URL']
+        engine = self.db.engines.get(READ_BIND) or self.db.engine
+        return async_url(engine.url.render_as_string(hide_password=False))
+
+    def engine(self):
+        """The current app's engine, created (with the loop) on first use in each process"""
+        app = current_app._get_current_object()
+        entry = self._engines.get(app)
+        if entry is None or entry[0] != os.getpid():
+            with self._lock:
+                entry = self._engines.get(app)
+                if entry is None or entry[0] != os.getpid():
+                    entry = self._engines[app] = (os.getpid(), self._start(app.config))
+        return entry[1]
+
+    def _start(self, config):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        # One event loop per process, on a daemon thread: async driver connections (and the
+        # engine's pool) are bound to the loop that opened them, so every batch runs there
+        if self._loop_pid != os.getpid():
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name='async-db', daemon=True).start()
+            self._loop_pid = os.getpid()
+        engine = create_async_engine(self.url, **config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        if engine.dialect.name == 'sqlite' and config.get('SQLITE_TUNING', True):
+            event.listen(engine.sync_engine, 'connect', _sqlite_pragmas(config, read_only=True))
+        return engine
+
+    async def fetch(self, statement):
+        """Execute a Core select on a connection of its own and return all rows"""
+        async with self.engine().connect() as connection:
+            return (await connection.execute(statement)).all()
+
+    def run(self, function, *args):
+        """Run coroutine `function` on the database loop and wait for its result (from any thread)
+
+        The calling app's context is pushed in the loop task, so the tasks `function` starts
+        (and fetch()) see the same current_app.
+        """
+        self.engine()
+        app = current_app._get_current_object()
+
+        async def call():
+            with app.app_context():
+                return await function(*args)
+        return asyncio.run_coroutine_threadsafe(call(), self._loop).result()
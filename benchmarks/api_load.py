@@ -0,0 +1,214 @@
+"""
+API load benchmark
+Seeds a throwaway database at a configurable scale (see seed.py), then drives every
+GET /api/* route through the Flask test client and through a local pre-forked
+multi-worker WSGI server, reporting p50/p95/p99 latency, throughput and peak RSS.
+Results are written as JSON so runs from different commits can be compared.
+
+Usage: python benchmarks/api_load.py [--projects 5000 --posts 5000 ...] [--requests 200]
+       [--workers 4] [--concurrency 8] [--cold] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from seed import add_scale_arguments, seed
+
+# Query strings for routes that need one to do real work
+PARAMS = {'/api/search/': '?q=security+cloud'}
+
+
+def api_routes(app):
+    rules = [rule.rule for rule in app.url_map.iter_rules()
+             if rule.rule.startswith('/api/') and 'GET' in rule.methods and not rule.arguments]
+    return [rule + PARAMS.get(rule, '') for rule in sorted(rules)]
+
+
+def summarize(latencies, wall):
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+
+    return {'requests': len(latencies), 'p50_ms': percentile(0.50), 'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99), 'throughput_rps': round(len(latencies) / wall, 1)}
+
+
+def run_test_client(app, routes, requests):
+    client = app.test_client()
+    results = {}
+    for url in routes:
+        for _ in range(5):  # warm up the snapshot, caches and connection pool
+            client.get(url)
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = client.get(url)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+        results[url] = dict(summarize(latencies, time.perf_counter() - started), errors=errors)
+    # ru_maxrss is in KiB on Linux and includes seeding
+    return {'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'routes': results}
+
+
+def _serve(app, fd):
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    make_server('127.0.0.1', 0, app, fd=fd).serve_forever()
+
+
+def _peak_rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def _get(port, url):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        start = time.perf_counter()
+        connection.request('GET', url, headers={'Accept-Encoding': 'identity'})
+        response = connection.getresponse()
+        response.read()
+        return time.perf_counter() - start, response.status
+    finally:
+        connection.close()
+
+
+def run_server(app, routes, requests, workers, concurrency):
+    """Pre-fork `workers` single-threaded servers sharing one listening socket"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(128)
+    sock.set_inheritable(True)
+    port = sock.getsockname()[1]
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_serve, args=(app, sock.fileno()), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(concurrency) as pool:
+            for url in routes:
+                list(pool.map(lambda _: _get(port, url), range(workers * 5)))
+                started = time.perf_counter()
+                outcomes = list(pool.map(lambda _: _get(port, url), range(requests)))
+                wall = time.perf_counter() - started
+                results[url] = dict(summarize([latency for latency, _ in outcomes], wall),
+                                    errors=sum(status >= 400 for _, status in outcomes))
+        rss = [_peak_rss_kb(process.pid) for process in processes]
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+        sock.close()
+    known = [value for value in rss if value is not None]
+    return {'workers': workers, 'concurrency': concurrency,
+            'peak_rss_kb': max(known) if known else None,
+            'peak_rss_kb_total': sum(known) if known else None, 'routes': results}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    for mode in ('test_client', 'wsgi'):
+        if mode not in results['modes']:
+            continue
+        data = results['modes'][mode]
+        print(f'\n{mode} (peak RSS {data["peak_rss_kb"]} KiB)')
+        print(f'{"route":<34} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>9}')
+        for url, stats in data['routes'].items():
+            line = (f'{url:<34} {stats["p50_ms"]:>8} {stats["p95_ms"]:>8} {stats["p99_ms"]:>8} '
+                    f'{stats["throughput_rps"]:>9}')
+            previous = (baseline or {}).get('modes', {}).get(mode, {}).get('routes', {}).get(url)
+            if previous and previous['p95_ms']:
+                change = (stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+                line += f'   p95 {change:+.0f}% vs {baseline.get("commit")}'
+            if stats['errors']:
+                line += f'   {stats["errors"]} errors'
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_scale_arguments(parser)
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per route and mode')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--modes', default='test_client,wsgi')
+    parser.add_argument('--cold', action='store_true', help='disable the response cache')
+    parser.add_argument('--output', help='default: benchmarks/results/api_load-<commit>.json')
+    parser.add_argument('--compare', help='earlier results file to diff p95 against')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ.update(DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      SNAPSHOT_FOLDER=workdir, RATELIMIT_ENABLED='False',
+                      RESPONSE_CACHE_SIZE='0' if args.cold else os.environ.get('RESPONSE_CACHE_SIZE', '256'))
+    import app as portfolio
+
+    scale = {name: getattr(args, name) for name in ('skills', 'projects', 'experiences', 'posts', 'links')}
+    started = time.perf_counter()
+    counts = seed(portfolio, **scale)
+    print(f'Seeded {counts} in {time.perf_counter() - started:.1f}s')
+
+    routes = api_routes(portfolio.app)
+    modes = args.modes.split(',')
+    results = {'commit': git_commit(), 'created_at': datetime.now(timezone.utc).isoformat(),
+               'python': platform.python_version(), 'scale': counts, 'cold': args.cold, 'modes': {}}
+    if 'test_client' in modes:
+        results['modes']['test_client'] = run_test_client(portfolio.app, routes, args.requests)
+    if 'wsgi' in modes:
+        # Dispose inherited connections so forked workers open their own
+        with portfolio.app.app_context():
+            for engine in portfolio.db.engines.values():
+                engine.dispose()
+        results['modes']['wsgi'] = run_server(portfolio.app, routes, args.requests,
+                                              args.workers, args.concurrency)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results',
+                                         f'api_load-{results["commit"] or "unknown"}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nSaved {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+ASGI vs sync throughput benchmark
+Seeds a throwaway database (see seed.py), checks that the concurrent async snapshot build
+produces exactly the bytes of the sync one and times both under concurrent callers, then
+drives the threaded Flask server and the ASGI entry point (asgi.py, with and without
+ASYNC_QUERIES) with concurrent clients.
+
+Usage: python benchmarks/asgi_throughput.py [--projects 5000 --skills 500 ...] [--requests 400]
+       [--concurrency 16] [--repeat 10]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_load import ROOT, _get, summarize
+from async_db import HAS_GREENLET
+from seed import add_scale_arguments, seed
+
+ROUTES = ('/api/portfolio/', '/api/projects/', '/api/skills/grouped/', '/api/blog/?limit=10')
+
+
+def concurrent_builds(portfolio, callers, repeat):
+    """Median wall time of `callers` threads each building the snapshot body at once"""
+    def build(_):
+        with portfolio.app.test_request_context('/api/portfolio/'):
+            return portfolio.serialize_portfolio()
+
+    timings, bodies = [], set()
+    with ThreadPoolExecutor(callers) as pool:
+        for _ in range(repeat):
+            portfolio.serializer._fragments.clear()
+            start = time.perf_counter()
+            bodies.update(pool.map(build, range(callers)))
+            timings.append((time.perf_counter() - start) * 1000)
+    return bodies, statistics.median(timings)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(command, port, env):
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            _get(port, '/api/portfolio/')
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'{command[0]} did not start on port {port}')
+
+
+def drive(port, requests, concurrency):
+    results = {}
+    with ThreadPoolExecutor(concurrency) as pool:
+        for url in ROUTES:
+            list(pool.map(lambda _: _get(port, url), range(concurrency)))
+            started = time.perf_counter()
+            outcomes = list(pool.map(lambda _: _get(port, url), range(requests)))
+            wall = time.perf_counter() - started
+            results[url] = dict(summarize([latency for latency, _ in outcomes], wall),
+                                errors=sum(status >= 400 for _, status in outcomes))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_scale_arguments(parser)
+    parser.add_argument('--requests', type=int, default=400, help='timed requests per route and mode')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ.update(DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      SNAPSHOT_FOLDER=workdir, RATELIMIT_ENABLED='False', RESPONSE_CACHE_SIZE='0')
+    import app as portfolio
+
+    counts = seed(portfolio, args.skills, args.projects, args.experiences, args.posts, args.links)
+    print(f'Seeded {counts}')
+    if not HAS_GREENLET:
+        sys.exit('Async queries need sqlalchemy[asyncio] and aiosqlite')
+
+    expected = None
+    for callers in sorted({1, args.concurrency}):
+        print(f'\nsnapshot build, {callers} concurrent callers')
+        for mode, enabled in (('sync', False), ('async', True)):
+            portfolio.app.config['ASYNC_QUERIES'] = enabled
+            bodies, median = concurrent_builds(portfolio, callers, args.repeat)
+            expected = expected or bodies
+            status = 'identical' if len(bodies) == 1 and bodies == expected else 'MISMATCH'
+            print(f'{mode:<8} {median:8.2f} ms  {status}')
+            if status != 'identical':
+                sys.exit(1)
+
+    servers = {
+        'sync': (['flask', '--app', 'app', 'run', '--with-threads', '--no-reload', '--no-debugger'],
+                 {'ASYNC_QUERIES': 'False'}),
+        'asgi': (['uvicorn', 'asgi:application', '--workers', '1', '--log-level', 'warning'],
+                 {'ASYNC_QUERIES': 'False'}),
+        'asgi+async': (['uvicorn', 'asgi:application', '--workers', '1', '--log-level', 'warning'],
+                       {'ASYNC_QUERIES': 'True'}),
+    }
+    print(f'\n{"route":<24} {"mode":<10} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>9}')
+    for mode, (command, extra) in servers.items():
+        port = _free_port()
+        process = serve(command + ['--port', str(port)], port, dict(os.environ, **extra))
+        try:
+            results = drive(port, args.requests, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+        for url, stats in results.items():
+            line = (f'{url:<24} {mode:<10} {stats["p50_ms"]:>8} {stats["p95_ms"]:>8} '
+                    f'{stats["p99_ms"]:>8} {stats["throughput_rps"]:>9}')
+            if stats['errors']:
+                line += f'   {stats["errors"]} errors'
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Contact ingestion benchmark
+Posts N contact submissions from several client threads, once with a synchronous
+commit per request and once through the batched background queue, and reports
+request throughput and rows committed per second (including the final drain).
+
+Usage: python benchmarks/contact_ingest.py [--requests 2000] [--threads 8]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_mode(queued, requests, threads, results):
+    workdir = tempfile.mkdtemp()
+    os.environ.update(DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      SNAPSHOT_FOLDER=workdir,
+                      CONTACT_QUEUE_ENABLED=str(queued),
+                      CONTACT_QUEUE_SIZE=str(requests),
+                      RATELIMIT_ENABLED='False')
+    sys.path.insert(0, ROOT)
+    import app as portfolio
+    with portfolio.app.app_context():
+        portfolio.db.create_all()
+
+    def post(i):
+        client = portfolio.app.test_client()
+        return client.post('/api/contact/', json={
+            'name': 'Bench', 'email': 'bench@example.com',
+            'subject': f'Load {i}', 'message': 'x' * 200}).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        statuses = list(pool.map(post, range(requests)))
+    accepted = time.perf_counter() - start
+    portfolio.contact_queue.drain()
+    committed = time.perf_counter() - start
+
+    with portfolio.app.app_context():
+        rows = portfolio.Contact.query.count()
+    results.put({
+        'mode': 'queued' if queued else 'sync',
+        'req_per_sec': requests / accepted,
+        'rows_per_sec': rows / committed,
+        'rows': rows,
+        'non_2xx': sum(1 for s in statuses if s >= 300),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    print(f'{"mode":7} {"req/s":>9} {"rows/s":>9} {"rows":>6} {"non-2xx":>8}')
+    for queued in (False, True):
+        results = ctx.Queue()
+        p = ctx.Process(target=run_mode, args=(queued, args.requests, args.threads, results))
+        p.start()
+        r = results.get()
+        p.join()
+        print(f'{r["mode"]:7} {r["req_per_sec"]:9.1f} {r["rows_per_sec"]:9.1f} {r["rows"]:6} {r["non_2xx"]:8}')
+
+
+if __name__ == '__main__':
+    main()
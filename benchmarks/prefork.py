@@ -0,0 +1,98 @@
+"""
+Pre-fork server benchmark
+Seeds a throwaway database (see seed.py) and serves it with gunicorn (gunicorn.conf.py) at
+one worker and at --workers workers. For each, drives the API with concurrent clients, then
+repeatedly warms every worker's caches, commits a profile edit from this process (as an admin
+write from another worker would) and counts responses that still show the old value, with and
+without CACHE_SYNC_ENABLED.
+
+Usage: python benchmarks/prefork.py [--projects 5000 --skills 500 ...] [--workers 4]
+       [--requests 400] [--concurrency 16] [--writes 20]
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asgi_throughput import _free_port, drive, serve
+from seed import add_scale_arguments, seed
+
+# Read after each write: a response-cached route and the prebuilt snapshot
+COHERENCE_ROUTES = ('/api/profiles/', '/api/portfolio/')
+
+
+def _body(port, url):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        connection.request('GET', url, headers={'Accept-Encoding': 'identity'})
+        return connection.getresponse().read()
+    finally:
+        connection.close()
+
+
+def coherence(portfolio, port, writes, concurrency):
+    """Stale responses out of all reads made right after each committed write"""
+    stale = total = 0
+    with ThreadPoolExecutor(concurrency) as pool, portfolio.app.app_context():
+        for i in range(writes):
+            urls = [url for url in COHERENCE_ROUTES for _ in range(concurrency * 4)]
+            list(pool.map(lambda url: _body(port, url), urls))  # every worker caches the old value
+            profile = portfolio.Profile.query.first()
+            profile.location = f'Bench city {os.getpid()}-{i}'
+            portfolio.db.session.commit()
+            marker = profile.location.encode()
+            bodies = list(pool.map(lambda url: _body(port, url), urls))
+            stale += sum(marker not in body for body in bodies)
+            total += len(bodies)
+    return stale, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_scale_arguments(parser)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--requests', type=int, default=400, help='timed requests per route and mode')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--writes', type=int, default=20, help='profile edits in the coherence check')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ.update(DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      SNAPSHOT_FOLDER=workdir, RATELIMIT_ENABLED='False')
+    import app as portfolio
+
+    counts = seed(portfolio, args.skills, args.projects, args.experiences, args.posts, args.links)
+    print(f'Seeded {counts}')
+
+    print(f'\n{"route":<24} {"workers":>7} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>9}')
+    stale = {}
+    for workers in sorted({1, args.workers}):
+        for sync in ('True', 'False'):
+            port = _free_port()
+            process = serve(['gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}'], port,
+                            dict(os.environ, WEB_CONCURRENCY=str(workers), CACHE_SYNC_ENABLED=sync))
+            try:
+                if sync == 'True':
+                    for url, stats in drive(port, args.requests, args.concurrency).items():
+                        print(f'{url:<24} {workers:>7} {stats["p50_ms"]:>8} {stats["p95_ms"]:>8} '
+                              f'{stats["p99_ms"]:>8} {stats["throughput_rps"]:>9}'
+                              + (f'   {stats["errors"]} errors' if stats['errors'] else ''))
+                stale[workers, sync] = coherence(portfolio, port, args.writes, args.concurrency)
+            finally:
+                process.terminate()
+                process.wait()
+
+    print(f'\n{"workers":>7} {"CACHE_SYNC_ENABLED":>18} {"stale reads after a write":>26}')
+    for (workers, sync), (count, total) in stale.items():
+        print(f'{workers:>7} {sync:>18} {f"{count} / {total}":>26}')
+    if any(count for (_, sync), (count, _) in stale.items() if sync == 'True'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
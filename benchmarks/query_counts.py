@@ -0,0 +1,118 @@
+"""
+SQL statement counts per API endpoint
+Seeds a throwaway database at two sizes and fails if any endpoint's
+statement count grows with the number of rows (an N+1 regression).
+
+Usage: python benchmarks/query_counts.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORKDIR = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORKDIR, 'query_counts.db')
+os.environ['SNAPSHOT_FOLDER'] = WORKDIR
+
+from sqlalchemy import event
+
+from app import (app, db, User, Profile, Skill, Project, Experience, Education,
+                 Certification, Achievement, BlogPost)
+
+ENDPOINTS = [
+    '/api/portfolio/',
+    '/api/profiles/',
+    '/api/skills/',
+    '/api/skills/grouped/',
+    '/api/skills/?sort=usage',
+    '/api/skills/1/usage',
+    '/api/projects/',
+    '/api/experiences/',
+    '/api/education/',
+    '/api/certifications/',
+    '/api/achievements/',
+    '/api/blog/',
+    '/api/blog/?fields=id,title,slug,excerpt',
+    '/api/blog/?fields=id,title&expand=author',
+    '/api/blog/?limit=10',
+    '/api/blog/post-0',
+    '/api/blog/?tag=python',
+    '/api/tags/',
+]
+
+
+def add_rows(start, count):
+    """Add `count` rows to every table, each linked to a few skills"""
+    base = datetime(2020, 1, 1)
+    for i in range(start, start + count):
+        user = User(username=f'user{i}', email=f'user{i}@example.com', first_name='User', last_name=str(i))
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Profile(user_id=user.id, bio=f'Bio {i}'))
+        skills = [Skill(name=f'Skill {i}-{k}', skill_type='tech', proficiency=k * 10) for k in range(3)]
+        db.session.add_all(skills)
+        db.session.add(Project(title=f'Project {i}', description='...', featured=True,
+                               created_at=base + timedelta(days=i), technologies=skills))
+        db.session.add(Experience(title=f'Role {i}', company='ACME', description='...',
+                                  start_date=(base + timedelta(days=i)).date(), skills_used=skills))
+        db.session.add(Education(degree='BSc', institution='Uni', field_of_study='CS',
+                                 start_date=(base + timedelta(days=i)).date()))
+        db.session.add(Certification(name=f'Cert {i}', issuer='Org', issue_date=(base + timedelta(days=i)).date()))
+        db.session.add(Achievement(title=f'Award {i}', description='...', date=(base + timedelta(days=i)).date()))
+        db.session.add(BlogPost(title=f'Post {i}', slug=f'post-{i}', content='Lorem ipsum ' * 200,
+                                tags=f'Python, Flask, topic {i}',
+                                author_id=user.id, status='published', published_at=base + timedelta(days=i)))
+    db.session.commit()
+
+
+def count_statements(client):
+    counts = {}
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # GET requests read through the 'read' bind, so listen on every engine
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        for url in ENDPOINTS:
+            app.extensions['response_cache'].clear()
+            with app.app_context():
+                app.extensions['snapshot'].invalidate()
+            statements.clear()
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            counts[url] = len(statements)
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', on_execute)
+    return counts
+
+
+def main():
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        add_rows(0, 2)
+    small = count_statements(client)
+    with app.app_context():
+        add_rows(2, 50)
+    large = count_statements(client)
+
+    failed = False
+    print(f'{"endpoint":45} {"2 rows":>7} {"52 rows":>8}')
+    for url in ENDPOINTS:
+        # A short last page may add the NULL-key query (pagination.py), so only growth counts
+        flag = '  <-- grows with row count' if large[url] > small[url] else ''
+        failed = failed or bool(flag)
+        print(f'{url:45} {small[url]:>7} {large[url]:>8}{flag}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
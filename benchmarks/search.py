@@ -0,0 +1,92 @@
+"""
+Full-text search benchmark
+Seeds a throwaway database with N synthetic blog posts, rebuilds the FTS5 index,
+times /api/search/ queries (response cache disabled) and post edits, each of which
+replaces the post's index document.
+
+Usage: python benchmarks/search.py [--posts 10000 100000] [--queries 200] [--edits 50]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TOPICS = ('security cloud python flask pentest exploit firewall network threat hunting '
+         'incident response malware forensics kubernetes docker audit compliance token '
+         'injection xss csrf oauth jwt encryption hashing phishing ransomware siem').split()
+# Topic words are sprinkled into filler vocabulary so each matches a realistic fraction of posts
+FILLER = [f'w{i}' for i in range(5000)]
+QUERIES = ['python', 'cloud security', 'incident resp', 'xss injection', 'threat hunting siem',
+           'kubernetes', 'oauth jwt', 'malware forensics', 'ransom']
+
+
+def run(posts, queries, edits):
+    workdir = tempfile.mkdtemp()
+    os.environ.update(DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      SNAPSHOT_FOLDER=workdir, RESPONSE_CACHE_SIZE='0')
+    for name in [m for m in sys.modules if m in ('app', 'config')]:
+        del sys.modules[name]
+    import app as portfolio
+
+    rng = random.Random(posts)
+    with portfolio.app.app_context():
+        portfolio.db.create_all()
+        user = portfolio.User(username='bench', email='bench@example.com')
+        portfolio.db.session.add(user)
+        portfolio.db.session.flush()
+        rows = [{
+            'title': ' '.join(rng.choices(TOPICS, k=2) + rng.choices(FILLER, k=4)),
+            'slug': f'post-{i}',
+            'content': ' '.join(rng.choice(TOPICS) if rng.random() < 0.02 else rng.choice(FILLER)
+                                for _ in range(300)),
+            'author_id': user.id,
+            'status': 'published',
+            'published_at': datetime(2024, 1, 1),
+        } for i in range(posts)]
+        portfolio.db.session.bulk_insert_mappings(portfolio.BlogPost, rows)
+        portfolio.db.session.commit()
+        start = time.perf_counter()
+        portfolio.search_index.reindex()
+        index_seconds = time.perf_counter() - start
+
+        edit_timings = []
+        for post in portfolio.BlogPost.query.order_by(portfolio.BlogPost.id).limit(edits):
+            post.title += ' edited'
+            start = time.perf_counter()
+            portfolio.db.session.commit()
+            edit_timings.append((time.perf_counter() - start) * 1000)
+
+    client = portfolio.app.test_client()
+    timings = []
+    for i in range(queries):
+        start = time.perf_counter()
+        response = client.get('/api/search/', query_string={'q': QUERIES[i % len(QUERIES)]})
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    timings.sort()
+    return index_seconds, statistics.median(timings), timings[int(len(timings) * 0.95)], \
+        statistics.median(edit_timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--edits', type=int, default=50, help='post edits to time')
+    args = parser.parse_args()
+
+    print(f'{"posts":>8} {"reindex s":>10} {"p50 ms":>8} {"p95 ms":>8} {"edit ms":>8}')
+    for posts in args.posts:
+        index_seconds, p50, p95, edit = run(posts, args.queries, args.edits)
+        print(f'{posts:>8} {index_seconds:10.1f} {p50:8.2f} {p95:8.2f} {edit:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Scaled sample data
+Runs the app's init_db() seeding, then bulk-inserts thousands of synthetic skills,
+projects, experiences and blog posts with project_skills/experience_skills link rows.
+
+Usage: python benchmarks/seed.py [--projects 5000] [--posts 5000] [--skills 500]
+       (writes to DATABASE_URL; imported by benchmarks/api_load.py)
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SKILL_TYPES = ('tech', 'soft', 'tool', 'lang')
+WORDS = ('security cloud python flask pentest exploit firewall network threat hunting incident '
+         'response malware forensics kubernetes docker audit compliance token injection oauth '
+         'encryption hashing phishing ransomware siem portfolio design api database cache').split()
+DEFAULT_SCALE = {'skills': 500, 'projects': 5000, 'experiences': 1000, 'posts': 5000}
+
+
+def _text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def seed(portfolio, skills=500, projects=5000, experiences=1000, posts=5000, links=4, rng_seed=0):
+    """Seed `portfolio` (the imported app module); return the row counts inserted"""
+    portfolio.init_db()
+    rng = random.Random(rng_seed)
+    base = datetime(2015, 1, 1)
+    db = portfolio.db
+    with portfolio.app.app_context():
+        author_id = portfolio.User.query.first().id
+        first_skill = (db.session.query(db.func.max(portfolio.Skill.id)).scalar() or 0) + 1
+        db.session.bulk_insert_mappings(portfolio.Skill, [{
+            'name': f'Skill {i}', 'skill_type': SKILL_TYPES[i % len(SKILL_TYPES)],
+            'proficiency': rng.randint(10, 100), 'description': _text(rng, 8),
+        } for i in range(skills)])
+        skill_ids = range(first_skill, first_skill + skills)
+
+        first_project = (db.session.query(db.func.max(portfolio.Project.id)).scalar() or 0) + 1
+        db.session.bulk_insert_mappings(portfolio.Project, [{
+            'title': f'Project {i} ' + _text(rng, 3), 'description': _text(rng, 60),
+            'url': f'https://example.com/projects/{i}', 'featured': i % 50 == 0,
+            'created_at': base + timedelta(hours=i), 'updated_at': base + timedelta(hours=i),
+        } for i in range(projects)])
+
+        first_experience = (db.session.query(db.func.max(portfolio.Experience.id)).scalar() or 0) + 1
+        db.session.bulk_insert_mappings(portfolio.Experience, [{
+            'title': f'Role {i}', 'company': f'Company {i % 200}', 'location': 'Hà Nội',
+            'start_date': (base + timedelta(days=i)).date(), 'description': _text(rng, 40),
+        } for i in range(experiences)])
+
+        db.session.bulk_insert_mappings(portfolio.BlogPost, [{
+            'title': f'Post {i} ' + _text(rng, 4), 'slug': f'bench-post-{rng_seed}-{i}',
+            'content': _text(rng, 400), 'excerpt': _text(rng, 30), 'author_id': author_id,
+            'status': 'published' if i % 10 else 'draft', 'tags': ','.join(rng.sample(WORDS, 3)),
+            'created_at': base + timedelta(hours=i), 'published_at': base + timedelta(hours=i),
+        } for i in range(posts)])
+
+        link_rows = 0
+        if skill_ids:
+            for table, column, first, count in (
+                    (portfolio.project_skills, 'project_id', first_project, projects),
+                    (portfolio.experience_skills, 'experience_id', first_experience, experiences)):
+                rows = [{column: owner, 'skill_id': skill}
+                        for owner in range(first, first + count)
+                        for skill in rng.sample(skill_ids, min(links, len(skill_ids)))]
+                if rows:
+                    db.session.execute(table.insert(), rows)
+                link_rows += len(rows)
+        db.session.commit()
+        # Bulk inserts skip the ORM events that render posts and keep tags, the search index
+        # and skill usage in sync
+        portfolio.blog_content.render_all(missing_only=True)
+        portfolio.blog_tags.rebuild()
+        db.session.commit()
+        portfolio.search_index.reindex()
+        portfolio.skill_usage.rebuild()
+    return {'skills': skills, 'projects': projects, 'experiences': experiences,
+            'posts': posts, 'links': link_rows}
+
+
+def add_scale_arguments(parser):
+    for name, default in DEFAULT_SCALE.items():
+        parser.add_argument(f'--{name}', type=int, default=default)
+    parser.add_argument('--links', type=int, default=4, help='skills linked to each project/experience')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    import app as portfolio
+    counts = seed(portfolio, args.skills, args.projects, args.experiences, args.posts, args.links)
+    print(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Portfolio serialization benchmark
+Seeds a throwaway database (see seed.py), checks that the compiled Core-row encoder
+produces exactly the bytes jsonify() produces for /api/portfolio/, and times both.
+
+Usage: python benchmarks/serialization.py [--projects 5000 --skills 500 ...] [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seed import add_scale_arguments, seed
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return body, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_scale_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ.update(DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      SNAPSHOT_FOLDER=workdir)
+    import app as portfolio
+    from serializer import orjson
+
+    counts = seed(portfolio, args.skills, args.projects, args.experiences, args.posts, args.links)
+    print(f'Seeded {counts}')
+    with portfolio.app.app_context():
+        # Characters the string encoders escape differently unless handled: DEL and non-ASCII
+        project = portfolio.Project.query.first()
+        project.title = 'Café \u2028 "quoted"'
+        project.description = 'Tab\tDEL\x7f </script>'
+        portfolio.db.session.commit()
+    snapshot = portfolio.portfolio_snapshot
+    serializer = portfolio.serializer
+    backends = ['json'] + (['orjson'] if orjson is not None else [])
+
+    with portfolio.app.test_request_context('/api/portfolio/'):
+        expected, baseline = timed(snapshot.jsonify, args.repeat)
+        print(f'{"to_dict() + jsonify()":<32} {baseline:8.2f} ms  ({len(expected)} bytes)')
+        for name in backends:
+            serializer.use(name)
+            for cached in (False, True):
+                def run():
+                    if not cached:
+                        serializer._fragments.clear()
+                    return portfolio.serialize_portfolio()
+                body, median = timed(run, args.repeat)
+                label = f'compiled ({name}{", warm skills" if cached else ""})'
+                status = 'identical' if body == expected else 'MISMATCH'
+                print(f'{label:<32} {median:8.2f} ms  {baseline / median:5.1f}x  {status}')
+                if body != expected:
+                    sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
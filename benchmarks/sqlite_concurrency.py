@@ -0,0 +1,147 @@
+"""
+SQLite concurrency benchmark
+Runs reader processes against API endpoints while writer processes commit contact-form
+rows into the same database file, once with default SQLite settings and once with the
+WAL/pragma tuning from database.py, and reports read latency and read timeouts (reads
+that gave up with "database is locked") under write load, plus the write rate.
+
+Both modes use the same busy timeout (--busy-timeout), and the contact queue is off so
+every submission commits in its request, as it would without the queue.
+
+Usage: python benchmarks/sqlite_concurrency.py [--readers 4] [--writers 2] [--seconds 5]
+                                                [--busy-timeout 1000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_app():
+    sys.path.insert(0, ROOT)
+    import app as portfolio
+    return portfolio
+
+
+def setup():
+    portfolio = _load_app()
+    with portfolio.app.app_context():
+        portfolio.setup_database()
+        portfolio.seed_sample_data()
+
+
+def _busy_timeout(portfolio, milliseconds):
+    """The untuned engines get pysqlite's default timeout; give them the tuned one's"""
+    from sqlalchemy import event
+
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.execute(f'PRAGMA busy_timeout={milliseconds}')
+
+    with portfolio.app.app_context():
+        for engine in portfolio.db.engines.values():
+            event.listen(engine, 'connect', on_connect)
+
+
+def worker(role, seconds, busy_timeout, start, results):
+    portfolio = _load_app()
+    if os.environ['SQLITE_TUNING'] == 'False':
+        _busy_timeout(portfolio, busy_timeout)
+    # Failed reads raise out of the test client instead of becoming an opaque 500 page
+    portfolio.app.config['PROPAGATE_EXCEPTIONS'] = True
+    client = portfolio.app.test_client()
+    cache = portfolio.app.extensions['response_cache']
+    latencies, errors, locked = [], 0, 0
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        i += 1
+        began = time.perf_counter()
+        try:
+            if role == 'write':
+                # The contact view answers 400 with the database error as its message
+                response = client.post('/api/contact/', json={
+                    'name': 'Bench', 'email': 'bench@example.com',
+                    'subject': f'Load {os.getpid()}-{i}', 'message': 'x' * 200})
+            else:
+                # Uncached, so every read reaches the database
+                cache.clear()
+                response = client.get('/api/blog/?limit=20' if i % 2 else '/api/projects/')
+            failure = response.get_data(as_text=True) if response.status_code >= 400 else None
+        except Exception as e:
+            failure = str(e)
+        latencies.append(time.perf_counter() - began)
+        if failure is not None:
+            errors += 1
+            locked += 'locked' in failure
+    results.put((role, latencies, errors, locked))
+
+
+def _percentile(latencies, fraction):
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000 if latencies else 0
+
+
+def run(mode, readers, writers, seconds, busy_timeout):
+    workdir = tempfile.mkdtemp()
+    os.environ.update(DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      SNAPSHOT_FOLDER=workdir,
+                      SQLITE_TUNING='True' if mode == 'tuned' else 'False',
+                      SQLITE_BUSY_TIMEOUT_MS=str(busy_timeout),
+                      CONTACT_QUEUE_ENABLED='False',
+                      RATELIMIT_ENABLED='False')
+    ctx = multiprocessing.get_context('spawn')
+    p = ctx.Process(target=setup)
+    p.start()
+    p.join()
+
+    results, start = ctx.Queue(), ctx.Event()
+    roles = ['read'] * readers + ['write'] * writers
+    procs = [ctx.Process(target=worker, args=(role, seconds, busy_timeout, start, results)) for role in roles]
+    for p in procs:
+        p.start()
+    # Imports and engine setup take a while; start the clock for everyone at once
+    time.sleep(2)
+    start.set()
+    collected = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    reads = sorted(l for role, lats, _, _ in collected if role == 'read' for l in lats)
+    writes = [l for role, lats, _, _ in collected if role == 'write' for l in lats]
+    return {
+        'mode': mode,
+        'reads_per_sec': len(reads) / seconds,
+        'read_p50_ms': _percentile(reads, 0.5),
+        'read_p99_ms': _percentile(reads, 0.99),
+        'read_max_ms': reads[-1] * 1000 if reads else 0,
+        'read_timeouts': sum(l for role, _, _, l in collected if role == 'read'),
+        'read_errors': sum(e for role, _, e, _ in collected if role == 'read'),
+        'writes_per_sec': len(writes) / seconds,
+        'write_errors': sum(e for role, _, e, _ in collected if role == 'write'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--busy-timeout', type=int, default=1000, help='milliseconds, both modes')
+    args = parser.parse_args()
+
+    print(f'{"mode":8} {"reads/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8} {"timeouts":>9} '
+          f'{"errors":>7} {"writes/s":>9} {"w errors":>9}')
+    for mode in ('default', 'tuned'):
+        r = run(mode, args.readers, args.writers, args.seconds, args.busy_timeout)
+        print(f'{r["mode"]:8} {r["reads_per_sec"]:8.1f} {r["read_p50_ms"]:8.2f} {r["read_p99_ms"]:8.2f} '
+              f'{r["read_max_ms"]:8.2f} {r["read_timeouts"]:9} {r["read_errors"]:7} '
+              f'{r["writes_per_sec"]:9.1f} {r["write_errors"]:9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Startup benchmark
+Sets up a throwaway database with `flask seed`, then times cold starts in fresh interpreters:
+importing app.py, building the app with create_app() and serving the first GET request.
+Also lists the packages slowest to import from `python -X importtime` and which optional
+heavy modules (Alembic, Markdown, nh3, Pillow) a serving process ends up loading.
+
+Usage: python benchmarks/startup.py [--runs 10] [--url /api/portfolio/] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('alembic', 'flask_migrate', 'markdown', 'nh3', 'PIL', 'sqlalchemy.ext.asyncio')
+
+# Runs in each fresh interpreter; prints one JSON line
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import app as portfolio
+imported = time.perf_counter()
+application = portfolio.create_app()
+created = time.perf_counter()
+response = application.test_client().get(sys.argv[1])
+served = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000,
+                  'first_request_ms': (served - created) * 1000, 'status': response.status_code,
+                  'loaded': [name for name in sys.argv[2:] if name in sys.modules]}))
+'''
+
+
+def probe(url, env):
+    result = subprocess.run([sys.executable, '-c', PROBE, url, *HEAVY_MODULES], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_times(env, top):
+    """The `top` packages that take longest to import with app.py, summing each module's self time"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app; app.app'],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    packages = {}
+    for line in result.stderr.splitlines():
+        fields = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or not fields[0].strip().isdigit():
+            continue
+        package = fields[2].strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(fields[0])
+    return sorted(((microseconds, package) for package, microseconds in packages.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to time')
+    parser.add_argument('--url', default='/api/portfolio/', help='first request to serve')
+    parser.add_argument('--top', type=int, default=15, help='slowest packages to list')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+               SNAPSHOT_FOLDER=workdir, RATELIMIT_ENABLED='False')
+    subprocess.run(['flask', '--app', 'app', 'seed'], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+    runs = [probe(args.url, env) for _ in range(args.runs)]
+    if any(run['status'] != 200 for run in runs):
+        sys.exit(f'GET {args.url} failed: {sorted({run["status"] for run in runs})}')
+    print(f'{"phase":<16} {"median ms":>10} {"min ms":>8} {"max ms":>8}   ({args.runs} fresh processes)')
+    for phase in ('import_ms', 'create_app_ms', 'first_request_ms'):
+        values = [run[phase] for run in runs]
+        print(f'{phase[:-3]:<16} {statistics.median(values):>10.1f} {min(values):>8.1f} {max(values):>8.1f}')
+    totals = [run['import_ms'] + run['create_app_ms'] + run['first_request_ms'] for run in runs]
+    print(f'{"total":<16} {statistics.median(totals):>10.1f} {min(totals):>8.1f} {max(totals):>8.1f}')
+    print(f'\nheavy modules loaded when serving {args.url}: {", ".join(runs[0]["loaded"]) or "none"}')
+
+    print(f'\n{"import ms":>10}  slowest packages (python -X importtime, self time summed per package)')
+    for microseconds, package in import_times(env, args.top):
+        print(f'{microseconds / 1000:>10.1f}  {package}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+Response cache
+In-process LRU cache for serialized API responses, invalidated by per-table versions
+that pre-forked workers keep in step through stamp files
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from threading import Lock, get_ident
+
+from flask import Response, current_app, make_response, request
+from sqlalchemy import event
+from werkzeug.http import generate_etag
+
+from streaming import streaming_requested
+
+# Filesystem timestamp granularity to allow for before trusting an unchanged folder mtime
+RACY_NS = 2 * 10 ** 9
+
+
+class TableVersions:
+    """Monotonic version counter per table, bumped on every write
+
+    Once shared through a folder, committed writes also replace a stamp file per table, and
+    reading a version first checks the stamps, so a write in one worker process bumps the
+    version in every other one.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._modified = {}
+        self._started = datetime.now(timezone.utc).replace(microsecond=0)
+        self._lock = Lock()
+        self.folder = None
+        self._seen = {}  # table -> (inode, mtime_ns) of the last stamp applied
+        self._checked = None  # (folder mtime_ns, time_ns) of the last full check
+
+    def share(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+
+    def bump(self, table):
+        with self._lock:
+            self._bump(table, datetime.now(timezone.utc).replace(microsecond=0))
+
+    def _bump(self, table, modified):
+        self._versions[table] = self._versions.get(table, 0) + 1
+        self._modified[table] = modified
+
+    def publish(self, tables):
+        """Replace the stamps of committed `tables` so other processes bump them too"""
+        if self.folder is None:
+            return
+        for table in tables:
+            path = os.path.join(self.folder, table)
+            tmp = f'{path}.{os.getpid()}.{get_ident()}.tmp'
+            with open(tmp, 'w') as f:
+                f.write(f'{os.getpid()} {time.time_ns()}\n')
+                stat = os.fstat(f.fileno())
+            os.replace(tmp, path)
+            # This process already bumped the table; a newer stamp from elsewhere still differs
+            with self._lock:
+                self._seen[table] = (stat.st_ino, stat.st_mtime_ns)
+
+    def sync(self):
+        """Bump the tables whose stamps another process replaced since the last check"""
+        # Replacing a stamp updates the folder's mtime, so one stat covers every table, unless
+        # the last full check ran within the timestamp granularity of that mtime
+        started = time.time_ns()
+        try:
+            folder_mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return
+        checked = self._checked
+        if checked is not None and checked[0] == folder_mtime and checked[1] - folder_mtime > RACY_NS:
+            return
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                # Each stamp is a new file, so its inode changes even within one mtime tick
+                signature = (stat.st_ino, stat.st_mtime_ns)
+                with self._lock:
+                    # Applied together, so no thread sees the stamp as seen before the bump
+                    if self._seen.get(entry.name) != signature:
+                        self._seen[entry.name] = signature
+                        self._bump(entry.name, datetime.fromtimestamp(int(stat.st_mtime), timezone.utc))
+        self._checked = (folder_mtime, started)
+
+    def stamps(self, tables):
+        """[inode, mtime_ns] of each table's stamp (None if never written); {} when not shared"""
+        if self.folder is None:
+            return {}
+        signatures = {}
+        for table in tables:
+            try:
+                stat = os.stat(os.path.join(self.folder, table))
+            except OSError:
+                signatures[table] = None
+            else:
+                signatures[table] = [stat.st_ino, stat.st_mtime_ns]
+        return signatures
+
+    def get(self, tables):
+        if self.folder is not None:
+            self.sync()
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def last_modified(self, tables):
+        """Latest write time seen for any of the tables, or process start if none"""
+        with self._lock:
+            return max([self._modified.get(table, self._started) for table in tables],
+                       default=self._started)
+
+
+def mark_written(session, *tables):
+    """Record tables written through Core on `session`, so its commit invalidates them like ORM writes"""
+    session.info.setdefault('written_tables', set()).update(tables)
+
+
+class ResponseCache:
+    """Bounded LRU cache of JSON response bodies keyed by app, route and query args"""
+
+    def __init__(self, app=None, maxsize=256):
+        self.maxsize = maxsize
+        self.versions = TableVersions()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.commit_listeners = []  # called with the set of tables written by each commit
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.maxsize = app.config.setdefault('RESPONSE_CACHE_SIZE', self.maxsize)
+        app.config.setdefault('CACHE_SYNC_ENABLED', True)
+        if app.config['CACHE_SYNC_ENABLED']:
+            folder = app.config.get('CACHE_SYNC_FOLDER') or \
+                os.path.join(app.config.get('SNAPSHOT_FOLDER') or app.instance_path, 'table_versions')
+            self.versions.share(folder)
+        app.extensions['response_cache'] = self
+
+    def watch(self, *models):
+        """Bump the table version of each model whenever a row is written"""
+        for model in models:
+            for name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(model, name, self._on_write)
+
+    def watch_session(self, session):
+        """Bump again after commit so entries built from uncommitted reads are dropped"""
+        @event.listens_for(session, 'after_flush')
+        def _collect(sess, flush_context):
+            tables = sess.info.setdefault('written_tables', set())
+            for obj in list(sess.new) + list(sess.dirty) + list(sess.deleted):
+                table = getattr(obj, '__tablename__', None)
+                if table:
+                    tables.add(table)
+
+        @event.listens_for(session, 'after_commit')
+        def _bump(sess):
+            self.written(sess.info.pop('written_tables', set()))
+
+        @event.listens_for(session, 'after_rollback')
+        def _discard(sess):
+            sess.info.pop('written_tables', None)
+
+    def written(self, tables):
+        """Invalidate committed `tables` here and, through the stamps, in other processes"""
+        for table in tables:
+            self.versions.bump(table)
+        self.versions.publish(tables)
+        if tables:
+            for listener in self.commit_listeners:
+                listener(tables)
+
+    def _on_write(self, mapper, connection, target):
+        self.versions.bump(mapper.local_table.name)
+
+    def get(self, key, version):
+        """Return (body, mimetype, etag, last_modified) for a fresh entry, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1:]
+
+    def set(self, key, version, body, mimetype, etag, last_modified):
+        with self._lock:
+            self._entries[key] = (version, body, mimetype, etag, last_modified)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def cached(self, *models):
+        """Cache a view's body until any of the given models' tables change
+
+        Responses carry a strong ETag (content hash) and Last-Modified, so
+        conditional GETs against a fresh entry answer 304 without serializing.
+        Streams are negotiated by the Accept header as well as the query args,
+        so they bypass the cache and every response varies on Accept.
+        """
+        tables = tuple(model.__tablename__ for model in models)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                response = self._respond(tables, view, args, kwargs)
+                response.vary.add('Accept')
+                return response
+            return wrapper
+        return decorator
+
+    def _respond(self, tables, view, args, kwargs):
+        """Serve the cached body for this request, or build and cache it"""
+        if streaming_requested():
+            return make_response(view(*args, **kwargs))
+        # Apps built by create_app() share this cache but not their databases
+        key = (current_app._get_current_object(), request.path, tuple(sorted(request.args.items(multi=True))))
+        # Read the version before building so a concurrent write makes the entry stale
+        version = self.versions.get(tables)
+        entry = self.get(key, version)
+        if entry is not None:
+            body, mimetype, etag, last_modified = entry
+            response = Response(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            return response.make_conditional(request)
+
+        last_modified = self.versions.last_modified(tables)
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            body = response.get_data()
+            etag = generate_etag(body)
+            self.set(key, version, body, response.mimetype, etag, last_modified)
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            return response.make_conditional(request)
+        return response
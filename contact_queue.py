@@ -0,0 +1,131 @@
+"""
+Contact ingestion queue
+Validated submissions go on a bounded in-process queue and a background thread
+writes them in batches, so a burst of POSTs doesn't pay one commit per request
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from flask import current_app
+
+
+class QueueFull(Exception):
+    """Raised when the queue is at capacity; the caller should answer 429"""
+
+
+class ContactQueue:
+    def __init__(self, app=None, db=None, model=None):
+        self.db = db
+        self.model = model
+        self.written = 0
+        self.failed = 0
+        self._writers = {}  # app -> _Writer, replaced when the process forks
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CONTACT_QUEUE_ENABLED', True)
+        app.config.setdefault('CONTACT_QUEUE_SIZE', 1000)
+        app.config.setdefault('CONTACT_BATCH_SIZE', 50)
+        app.config.setdefault('CONTACT_FLUSH_INTERVAL', 0.5)
+        app.extensions['contact_queue'] = self
+
+    @property
+    def enabled(self):
+        return current_app.config['CONTACT_QUEUE_ENABLED']
+
+    def _writer(self):
+        # Started lazily, and restarted after fork, so pre-forked workers each get a writer;
+        # each app writes its own rows, with its own config and database
+        app = current_app._get_current_object()
+        writer = self._writers.get(app)
+        if writer is not None and writer.running():
+            return writer
+        with self._lock:
+            writer = self._writers.get(app)
+            if writer is None or not writer.running():
+                writer = self._writers[app] = _Writer(self, app)
+                atexit.register(writer.drain)
+        return writer
+
+    def submit(self, mapping):
+        """Queue one row for insertion; raise QueueFull instead of blocking"""
+        try:
+            self._writer().queue.put_nowait(mapping)
+        except queue.Full:
+            raise QueueFull()
+
+    def pending(self):
+        return sum(writer.queue.qsize() for writer in list(self._writers.values()) if writer.running())
+
+    def drain(self, timeout=10):
+        """Stop the writers once everything still queued has been flushed"""
+        for writer in list(self._writers.values()):
+            writer.drain(timeout)
+
+
+class _Writer:
+    """One app's queue and the background thread that commits it"""
+
+    def __init__(self, contacts, app):
+        self.contacts = contacts
+        self.app = app
+        self.queue = queue.Queue(maxsize=app.config['CONTACT_QUEUE_SIZE'])
+        self.pid = os.getpid()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='contact-writer', daemon=True)
+        self._thread.start()
+
+    def running(self):
+        return self.pid == os.getpid() and self._thread.is_alive()
+
+    def _run(self):
+        batch_size = self.app.config['CONTACT_BATCH_SIZE']
+        interval = self.app.config['CONTACT_FLUSH_INTERVAL']
+        while not (self._stop.is_set() and self.queue.empty()):
+            batch = []
+            deadline = time.monotonic() + interval
+            while len(batch) < batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        contacts = self.contacts
+        with self.app.app_context():
+            session = contacts.db.session
+            try:
+                session.bulk_insert_mappings(contacts.model, batch)
+                session.commit()
+                contacts.written += len(batch)
+                return
+            except Exception:
+                session.rollback()
+            # Isolate the bad row(s) so one invalid submission doesn't drop the batch
+            for mapping in batch:
+                try:
+                    session.bulk_insert_mappings(contacts.model, [mapping])
+                    session.commit()
+                    contacts.written += 1
+                except Exception:
+                    session.rollback()
+                    contacts.failed += 1
+                    self.app.logger.exception('Dropped contact submission')
+
+    def drain(self, timeout=10):
+        """Stop the writer once everything still queued has been flushed"""
+        if self.pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
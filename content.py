@@ -0,0 +1,169 @@
+"""
+Content pipeline
+Renders Markdown post bodies to sanitized HTML once, on write, together with an HTML-safe
+excerpt and a reading time, so the read path only serves stored columns
+"""
+
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+
+import click
+from flask import current_app
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.orm.attributes import get_history
+
+from cache import mark_written
+
+MARKDOWN_EXTENSIONS = ('fenced_code', 'tables', 'sane_lists')
+LANGUAGE_CLASS = re.compile(r'language-[\w+#-]+')
+BATCH_SIZE = 500
+
+
+def render_markdown(text):
+    """Markdown -> HTML with scripts, event handlers and unsafe URLs removed"""
+    # Imported on first use: only writes render, so serving processes never load them
+    import markdown
+    import nh3
+
+    html = markdown.markdown(text or '', extensions=MARKDOWN_EXTENSIONS, output_format='html')
+    # nh3's defaults plus the language class fenced code blocks carry
+    attributes = dict(nh3.ALLOWED_ATTRIBUTES, code={'class'})
+    return nh3.clean(html, attributes=attributes, attribute_filter=_filter_attribute)
+
+
+def clean_html(fragment):
+    """A hand-written HTML fragment with scripts, event handlers and unsafe URLs removed"""
+    import nh3
+
+    return nh3.clean(fragment or '')
+
+
+def _filter_attribute(tag, name, value):
+    if tag == 'code' and name == 'class':
+        return value if LANGUAGE_CLASS.fullmatch(value) else None
+    return value
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def plain_text(html):
+    """The words of `html` with tags dropped and entities decoded"""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return ' '.join(' '.join(parser.parts).split())
+
+
+def make_excerpt(text, words=40):
+    parts = text.split()
+    return ' '.join(parts[:words]) + ('…' if len(parts) > words else '')
+
+
+def reading_minutes(text, words_per_minute=200):
+    return max(1, math.ceil(len(text.split()) / words_per_minute))
+
+
+class ContentPipeline:
+    """Keep `model`'s html, excerpt and reading_time columns rendered from its Markdown `source`
+
+    An excerpt the author wrote is kept, sanitized; a missing one, or one generated from the
+    previous source, is regenerated whenever the source changes. Both are HTML (clients put
+    them in innerHTML), so generated excerpts are the post's text escaped.
+    """
+
+    def __init__(self, app=None, db=None, model=None, source='content', html='content_html',
+                 excerpt='excerpt', reading_time='reading_time'):
+        self.db = db
+        self.model = model
+        self.columns = {'source': source, 'html': html, 'excerpt': excerpt, 'reading_time': reading_time}
+        event.listen(db.session, 'before_flush', self._before_flush)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EXCERPT_WORDS', 40)
+        app.config.setdefault('READING_WORDS_PER_MINUTE', 200)
+        app.extensions['content'] = self
+        app.cli.add_command(content_cli)
+
+    def render(self, source, excerpt=None, previous=None):
+        """Column values for `source`; `excerpt` is kept unless missing or generated from `previous`"""
+        html = render_markdown(source)
+        text = plain_text(html)
+        if not excerpt or (previous is not None
+                           and excerpt == self._excerpt(plain_text(render_markdown(previous)))):
+            excerpt = self._excerpt(text)
+        else:
+            excerpt = clean_html(excerpt)
+        return {self.columns['html']: html, self.columns['excerpt']: excerpt,
+                self.columns['reading_time']: reading_minutes(text, current_app.config['READING_WORDS_PER_MINUTE'])}
+
+    def _excerpt(self, text):
+        # plain_text() decodes entities, so markup shown in the post must be escaped again
+        return escape(make_excerpt(text, current_app.config['EXCERPT_WORDS']), quote=False)
+
+    def _before_flush(self, session, flush_context, instances):
+        columns = self.columns
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, self.model):
+                continue
+            source = get_history(obj, columns['source'])
+            excerpt = getattr(obj, columns['excerpt'])
+            excerpt_changed = get_history(obj, columns['excerpt']).has_changes()
+            html = getattr(obj, columns['html'])
+            if not source.has_changes() and html is not None:
+                if excerpt_changed:
+                    # Only the excerpt was edited: it is served as HTML too, so clean it (or
+                    # regenerate it from the rendered post when cleared)
+                    setattr(obj, columns['excerpt'],
+                            clean_html(excerpt) if excerpt else self._excerpt(plain_text(html)))
+                continue
+            # An excerpt set in this same flush is the author's, whatever the old one was
+            previous = source.deleted[0] if source.deleted and not excerpt_changed else None
+            for name, value in self.render(getattr(obj, columns['source']), excerpt, previous).items():
+                setattr(obj, name, value)
+
+    def render_all(self, missing_only=False):
+        """Render stored rows in batches (bulk inserts bypass the flush hook); commit to apply"""
+        table = self.model.__table__
+        key = table.primary_key.columns.values()[0]
+        source, html, excerpt = (table.c[self.columns[name]] for name in ('source', 'html', 'excerpt'))
+        connection = self.db.session.connection()
+        query = select(key, source, excerpt).order_by(key)
+        if missing_only:
+            query = query.where(html.is_(None))
+        count, last = 0, None
+        while True:
+            page = query.where(key > last) if last is not None else query
+            rows = connection.execute(page.limit(BATCH_SIZE)).all()
+            if not rows:
+                return count
+            connection.execute(update(table).where(key == bindparam('row_id')),
+                               [dict(self.render(row[1], row[2]), row_id=row[0]) for row in rows])
+            mark_written(self.db.session, table.name)
+            count += len(rows)
+            last = rows[-1][0]
+
+
+@click.group('content')
+def content_cli():
+    """Manage rendered post content."""
+
+
+@content_cli.command('render')
+@click.option('--missing', is_flag=True, help='Only rows that were never rendered.')
+def render_command(missing):
+    """Render Markdown content to HTML, excerpts and reading times."""
+    pipeline = current_app.extensions['content']
+    count = pipeline.render_all(missing_only=missing)
+    pipeline.db.session.commit()
+    click.echo(f'Rendered {count} posts')
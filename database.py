@@ -0,0 +1,99 @@
+"""
+Database configuration
+Pool settings, SQLite pragmas applied on connect, and routing of GET requests to a read-only engine
+"""
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect
+
+READ_BIND = 'read'
+IN_CHUNK = 500  # ids per IN (...) list, the batch size selectinload() uses
+
+
+def in_chunks(values):
+    """Split `values` into lists of at most IN_CHUNK, one per IN (...) statement"""
+    values = list(values)
+    for start in range(0, len(values), IN_CHUNK):
+        yield values[start:start + IN_CHUNK]
+
+
+def engine_options(app):
+    """Build SQLALCHEMY_ENGINE_OPTIONS / SQLALCHEMY_BINDS from the app's DB_* settings"""
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    options = {'pool_pre_ping': True}
+    if not _in_memory(uri):
+        options.update(pool_size=app.config['DB_POOL_SIZE'],
+                       max_overflow=app.config['DB_MAX_OVERFLOW'],
+                       pool_recycle=app.config['DB_POOL_RECYCLE'])
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', options)
+
+    read_uri = app.config.get('DATABASE_READ_URL') or (uri if uri.startswith('sqlite') else None)
+    if read_uri and not _in_memory(read_uri):
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[READ_BIND] = dict(options, url=read_uri)
+
+
+def add_missing_columns(engine, metadata):
+    """ALTER TABLE ... ADD COLUMN for nullable model columns an existing table lacks"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable and column.server_default is None:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.exec_driver_sql(
+                        f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+
+
+def _in_memory(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:')
+
+
+class RoutingSession(Session):
+    """Send reads made while serving GET/HEAD requests to the read-only engine
+
+    Flushes always use the primary engine, so a GET handler that writes still works,
+    but it won't read its own uncommitted rows back through the read engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() \
+                and request.method in ('GET', 'HEAD'):
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_database(app, db):
+    """Install connect-time pragmas on every SQLite engine of the app"""
+    if not app.config.get('SQLITE_TUNING', True):
+        return
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', _sqlite_pragmas(app.config, read_only=key == READ_BIND))
+
+
+def _sqlite_pragmas(config, read_only=False):
+    pragmas = [
+        # WAL lets readers proceed while a writer commits instead of failing with "database is locked"
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA busy_timeout={config["SQLITE_BUSY_TIMEOUT_MS"]}',
+        f'PRAGMA cache_size=-{config["SQLITE_CACHE_SIZE_KB"]}',
+        f'PRAGMA mmap_size={config["SQLITE_MMAP_SIZE"]}',
+    ]
+    if read_only:
+        pragmas.append('PRAGMA query_only=ON')
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+    return on_connect
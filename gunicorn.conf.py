@@ -0,0 +1,32 @@
+"""
+Gunicorn configuration
+Pre-fork production server, read by gunicorn from the working directory: the app is built once
+in the master (preload_app) and forked into worker processes that share its memory copy-on-write.
+Workers keep their response caches and snapshot coherent through CACHE_SYNC_ENABLED (cache.py).
+
+Usage: flask --app app db upgrade                 (once: schema; `flask --app app seed` for sample data)
+       gunicorn app:app                           (WEB_CONCURRENCY, GUNICORN_THREADS, HOST, PORT)
+"""
+
+import os
+
+cpus = os.cpu_count() or 1
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', 5000)}"
+# One process per core; together the threads cover gunicorn's suggested 2 * cores + 1 concurrency
+workers = int(os.environ.get('WEB_CONCURRENCY', cpus))
+threads = int(os.environ.get('GUNICORN_THREADS', max(2, (2 * cpus + 1) // workers)))
+worker_class = 'gthread'
+preload_app = True
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+
+
+def post_fork(server, worker):
+    # Connections the master opened while loading the app must not be shared across processes;
+    # the contact writer, image pool and async engine are already started per process
+    from app import app, db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,193 @@
+"""
+Image derivatives
+Resized WebP/AVIF/JPEG/PNG variants of static and uploaded images, rendered in a
+process pool and cached on disk with a size-bounded LRU
+"""
+
+import hashlib
+import os
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait as futures_wait
+
+from flask import abort, current_app, jsonify, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Optional - without Pillow the originals are served
+    Image = None
+
+WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+FORMATS = {'webp': 'image/webp', 'avif': 'image/avif', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+SOURCES = ('images/', 'uploads/')
+EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif')
+
+
+def supported_formats():
+    if Image is None:
+        return set()
+    return {fmt for fmt in FORMATS if fmt in ('jpeg', 'png') or features.check(fmt)}
+
+
+def render(source, target, width, fmt, quality):
+    """Process-pool job: write a resized copy of `source` to `target`"""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            image.thumbnail((width, image.height * width // image.width), Image.LANCZOS)
+        if fmt == 'jpeg' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        tmp = f'{target}.{os.getpid()}.tmp'
+        image.save(tmp, format=fmt.upper(), quality=quality, optimize=True)
+    os.replace(tmp, target)
+    return os.path.getsize(target)
+
+
+class ImageService:
+    def __init__(self, app=None):
+        self._pool = None
+        self._pool_pid = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._sizes = {}  # cache folder -> bytes, once scanned
+        self.formats = supported_formats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IMAGE_CACHE_FOLDER', os.path.join(app.instance_path, 'image_cache'))
+        app.config.setdefault('IMAGE_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+        app.config.setdefault('IMAGE_WORKERS', 2)
+        app.config.setdefault('IMAGE_WAIT_SECONDS', 0)
+        app.config.setdefault('IMAGE_QUALITY', 80)
+        app.extensions['images'] = self
+        app.add_url_rule('/img/<path:filename>', 'image', self.serve)
+
+    def _executor(self):
+        # Created lazily and per process, so pre-forked workers don't share a pool
+        if self._pool_pid != os.getpid():
+            self._pool = ProcessPoolExecutor(current_app.config['IMAGE_WORKERS'])
+            self._pool_pid = os.getpid()
+        return self._pool
+
+    def _choose_format(self, source):
+        """Requested format, or for fmt=auto the best one the client accepts"""
+        fmt = request.args.get('fmt', 'auto')
+        if fmt != 'auto':
+            return fmt if fmt in self.formats else None
+        for candidate in ('avif', 'webp'):
+            if candidate in self.formats and request.accept_mimetypes[FORMATS[candidate]]:
+                return candidate
+        return 'png' if source.lower().endswith('.png') else 'jpeg'
+
+    def serve(self, filename):
+        """GET /img/<path>?w=320&fmt=webp|avif|jpeg|png|auto"""
+        # Checked after normalizing, or images/../js/app.js would pass as an image source
+        filename = posixpath.normpath(filename)
+        if not filename.startswith(SOURCES) or not filename.lower().endswith(EXTENSIONS):
+            abort(404)
+        source = safe_join(current_app.static_folder, filename)
+        if source is None or not os.path.isfile(source):
+            abort(404)
+        if Image is None:
+            return send_file(source)
+
+        try:
+            requested = int(request.args.get('w', WIDTHS[-1]))
+        except ValueError:
+            return jsonify({'error': 'Invalid width'}), 400
+        # Snap to a fixed set of widths so the cache can't be filled with arbitrary sizes
+        width = next((w for w in WIDTHS if w >= requested), WIDTHS[-1])
+        fmt = self._choose_format(source)
+        if fmt is None:
+            return jsonify({'error': 'Unsupported format'}), 400
+
+        quality = current_app.config['IMAGE_QUALITY']
+        stat = os.stat(source)
+        key = hashlib.sha1(f'{filename}:{stat.st_mtime_ns}:{stat.st_size}:{width}:{fmt}:{quality}'
+                           .encode()).hexdigest()
+        target = os.path.join(current_app.config['IMAGE_CACHE_FOLDER'], key[:2], f'{key}.{fmt}')
+
+        if os.path.isfile(target):
+            os.utime(target)  # mark as recently used for LRU eviction
+        elif not self._generate(source, target, width, fmt, quality):
+            # Still rendering (or failed): answer with the original rather than holding the worker;
+            # no-store so the next request picks up the derivative
+            response = send_file(source)
+            response.cache_control.no_store = True
+            return response
+
+        response = send_file(target, mimetype=FORMATS[fmt], conditional=True, max_age=86400)
+        if request.args.get('fmt', 'auto') == 'auto':
+            response.vary.add('Accept')
+        return response
+
+    def _generate(self, source, target, width, fmt, quality):
+        """Start rendering in the pool, sharing in-flight jobs; return True if `target` exists
+
+        Waits at most IMAGE_WAIT_SECONDS (by default not at all): the render finishes in the
+        background and fills the cache for later requests.
+        """
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        config = current_app.config
+        # The callback runs on a pool thread without an app context, so it gets the settings
+        folder, max_bytes = config['IMAGE_CACHE_FOLDER'], config['IMAGE_CACHE_MAX_BYTES']
+        logger = current_app.logger
+        with self._lock:
+            future = self._pending.get(target)
+            submitted = future is None
+            if submitted:
+                future = self._executor().submit(render, source, target, width, fmt, quality)
+                self._pending[target] = future
+        if submitted:
+            # Outside the lock: a future that already finished runs the callback (which takes
+            # the lock) right here
+            future.add_done_callback(lambda f: self._finished(target, f, folder, max_bytes, logger))
+        if config['IMAGE_WAIT_SECONDS'] > 0:
+            futures_wait([future], timeout=config['IMAGE_WAIT_SECONDS'])
+        # Failures are logged once, by the callback
+        return future.done() and future.exception() is None
+
+    def _finished(self, target, future, folder, max_bytes, logger):
+        error = future.exception()
+        if error is not None:
+            logger.error('Failed to render %s', target, exc_info=error)
+        with self._lock:
+            self._pending.pop(target, None)
+            if error is None:
+                if folder not in self._sizes:
+                    self._sizes[folder] = self._scan(folder)[1]
+                else:
+                    self._sizes[folder] += future.result()
+                if self._sizes[folder] > max_bytes:
+                    self._evict(folder, max_bytes, keep=target)
+
+    def _scan(self, folder):
+        entries, total = [], 0
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self, folder, max_bytes, keep=None):
+        """Delete least recently used derivatives until under 90% of the size limit"""
+        entries, total = self._scan(folder)
+        limit = max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._sizes[folder] = total
@@ -0,0 +1,166 @@
+"""
+Request metrics
+Per-route latency histograms, SQL query counts/time and to_dict() serialization time,
+exposed in Prometheus text format at /metrics, plus an optional slow-request log
+"""
+
+import threading
+import time
+from functools import wraps
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_LOGGED_STATEMENTS = 50
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels, value):
+        series = self.series.setdefault(labels, [0] * len(self.buckets) + [0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, name, label_names):
+        for labels, series in sorted(self.series.items()):
+            base = _labels(label_names, labels)
+            for bound, count in zip(self.buckets, series):
+                yield f'{name}_bucket{{{base},le="{bound}"}} {count}'
+            yield f'{name}_bucket{{{base},le="+Inf"}} {series[-1]}'
+            yield f'{name}_sum{{{base}}} {series[-2]:.6f}'
+            yield f'{name}_count{{{base}}} {series[-1]}'
+
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """Collects in-process metrics; each worker process exposes its own counters"""
+
+    def __init__(self, app=None, db=None):
+        self._lock = threading.Lock()
+        self.latency = Histogram()
+        self.requests = {}   # (method, route, status) -> count
+        self.queries = {}    # (method, route) -> count
+        self.db_time = {}    # (method, route) -> seconds
+        self.serialize_time = {}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db=None):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('SLOW_REQUEST_SECONDS', 0)
+        app.extensions['metrics'] = self
+        if not app.config['METRICS_ENABLED']:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+        if db is not None:
+            with app.app_context():
+                for engine in db.engines.values():
+                    event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                    event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def instrument(self, *models):
+        """Time each model's to_dict(); nested calls are counted once, by the outermost
+
+        Models are shared by every app, so this runs once, at import; apps without
+        METRICS_ENABLED never start a request state and skip the timing.
+        """
+        for model in models:
+            model.to_dict = _timed(model.to_dict)
+
+    def _before_request(self):
+        g._metrics = {'start': time.perf_counter(), 'queries': 0, 'db_time': 0.0,
+                      'serialize_time': 0.0, 'depth': 0, 'statements': []}
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+        state = _request_state()
+        if state is None:
+            return
+        state['queries'] += 1
+        state['db_time'] += elapsed
+        if current_app.config['SLOW_REQUEST_SECONDS'] and len(state['statements']) < MAX_LOGGED_STATEMENTS:
+            state['statements'].append((elapsed, statement))
+
+    def _after_request(self, response):
+        # Streamed bodies are produced after this hook, so their latency covers the headers only
+        state = g.pop('_metrics', None)
+        if state is None:
+            return response
+        elapsed = time.perf_counter() - state['start']
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        key = (request.method, route)
+        with self._lock:
+            self.latency.observe(key, elapsed)
+            status = key + (response.status_code,)
+            self.requests[status] = self.requests.get(status, 0) + 1
+            self.queries[key] = self.queries.get(key, 0) + state['queries']
+            self.db_time[key] = self.db_time.get(key, 0.0) + state['db_time']
+            self.serialize_time[key] = self.serialize_time.get(key, 0.0) + state['serialize_time']
+
+        threshold = current_app.config['SLOW_REQUEST_SECONDS']
+        if threshold and elapsed >= threshold:
+            lines = [f'Slow request: {request.method} {request.full_path.rstrip("?")} -> {response.status_code} '
+                     f'in {elapsed * 1000:.1f}ms ({state["queries"]} queries, '
+                     f'{state["db_time"] * 1000:.1f}ms db, {state["serialize_time"] * 1000:.1f}ms to_dict)']
+            lines += [f'  [{seconds * 1000:.2f}ms] {statement}' for seconds, statement in state['statements']]
+            current_app.logger.warning('\n'.join(lines))
+        return response
+
+    def export(self):
+        """GET /metrics in Prometheus text exposition format"""
+        with self._lock:
+            lines = ['# HELP http_request_duration_seconds Request latency by route',
+                     '# TYPE http_request_duration_seconds histogram',
+                     *self.latency.render('http_request_duration_seconds', ('method', 'route')),
+                     '# HELP http_requests_total Requests by route and status',
+                     '# TYPE http_requests_total counter']
+            lines += [f'http_requests_total{{{_labels(("method", "route", "status"), key)}}} {count}'
+                      for key, count in sorted(self.requests.items())]
+            for name, help_text, values in (
+                    ('db_queries_total', 'SQL statements executed', self.queries),
+                    ('db_query_seconds_total', 'Time spent executing SQL', self.db_time),
+                    ('serialize_seconds_total', 'Time spent in model to_dict()', self.serialize_time)):
+                lines += [f'# HELP {name} {help_text} by route', f'# TYPE {name} counter']
+                lines += [f'{name}{{{_labels(("method", "route"), key)}}} {value:g}'
+                          for key, value in sorted(values.items())]
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+def _request_state():
+    return g.get('_metrics') if has_request_context() else None
+
+
+def _timed(to_dict):
+    @wraps(to_dict)
+    def wrapper(*args, **kwargs):
+        state = _request_state()
+        if state is None:
+            return to_dict(*args, **kwargs)
+        state['depth'] += 1
+        start = time.perf_counter()
+        try:
+            return to_dict(*args, **kwargs)
+        finally:
+            state['depth'] -= 1
+            if not state['depth']:
+                state['serialize_time'] += time.perf_counter() - start
+    return wrapper
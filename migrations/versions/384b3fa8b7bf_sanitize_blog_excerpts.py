@@ -0,0 +1,46 @@
+"""sanitize blog excerpts
+
+Revision ID: 384b3fa8b7bf
+Revises: 0e347a51c107
+Create Date: 2026-10-17 09:12:40.518207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '384b3fa8b7bf'
+down_revision = '0e347a51c107'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+blog_posts = sa.table('blog_posts', sa.column('id', sa.Integer), sa.column('excerpt', sa.Text))
+
+
+def upgrade():
+    # Excerpts are served as HTML; earlier generated ones held decoded text, so markup quoted
+    # in a post (e.g. `<img onerror=...>` in a code span) became live. Clean every stored one.
+    import nh3
+
+    connection = op.get_bind()
+    last = 0
+    while True:
+        rows = connection.execute(sa.select(blog_posts.c.id, blog_posts.c.excerpt)
+                                  .where(blog_posts.c.id > last, blog_posts.c.excerpt.isnot(None))
+                                  .order_by(blog_posts.c.id).limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        cleaned = ((row_id, excerpt, nh3.clean(excerpt)) for row_id, excerpt in rows)
+        changed = [{'row_id': row_id, 'excerpt': clean} for row_id, excerpt, clean in cleaned if clean != excerpt]
+        if changed:
+            connection.execute(blog_posts.update().where(blog_posts.c.id == sa.bindparam('row_id'))
+                               .values(excerpt=sa.bindparam('excerpt')), changed)
+        last = rows[-1][0]
+
+
+def downgrade():
+    # Sanitizing is not reversible; the cleaned excerpts stay
+    pass
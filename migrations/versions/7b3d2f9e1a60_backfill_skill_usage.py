@@ -0,0 +1,70 @@
+"""backfill skill usage
+
+Revision ID: 7b3d2f9e1a60
+Revises: 5a1c9e2d7f04
+Create Date: 2026-10-17 12:40:09.118532
+
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3d2f9e1a60'
+down_revision = '5a1c9e2d7f04'
+branch_labels = None
+depends_on = None
+
+# The aggregate as of this revision, kept here so later changes to usage.py don't alter it
+skills = sa.table('skills', sa.column('id', sa.Integer))
+projects = sa.table('projects', sa.column('id', sa.Integer), sa.column('created_at', sa.DateTime))
+experiences = sa.table('experiences', sa.column('id', sa.Integer), sa.column('start_date', sa.Date),
+                       sa.column('end_date', sa.Date), sa.column('current', sa.Boolean))
+project_skills = sa.table('project_skills', sa.column('project_id', sa.Integer), sa.column('skill_id', sa.Integer))
+experience_skills = sa.table('experience_skills', sa.column('experience_id', sa.Integer),
+                             sa.column('skill_id', sa.Integer))
+skill_usage = sa.table('skill_usage', sa.column('skill_id', sa.Integer), sa.column('project_count', sa.Integer),
+                       sa.column('experience_count', sa.Integer), sa.column('last_used', sa.Date),
+                       sa.column('in_use', sa.Boolean))
+
+
+def upgrade():
+    # skill_usage was created empty; only `flask seed` filled it
+    connection = op.get_bind()
+    rows = {skill_id: {'skill_id': skill_id, 'project_count': 0, 'experience_count': 0,
+                       'last_used': None, 'in_use': False}
+            for skill_id in connection.execute(sa.select(skills.c.id)).scalars()}
+    tracked = [
+        (project_skills.join(projects, projects.c.id == project_skills.c.project_id), project_skills.c.skill_id,
+         'project_count', projects.c.created_at, sa.literal(False)),
+        (experience_skills.join(experiences, experiences.c.id == experience_skills.c.experience_id),
+         experience_skills.c.skill_id, 'experience_count',
+         sa.func.coalesce(experiences.c.end_date, experiences.c.start_date), experiences.c.current),
+    ]
+    for link, skill_id, count, used, current in tracked:
+        query = sa.select(skill_id, sa.func.count(), sa.func.max(used),
+                          sa.func.max(sa.case((current, 1), else_=0)))\
+            .select_from(link).group_by(skill_id)
+        for target_id, total, last, in_use in connection.execute(query):
+            row = rows.get(target_id)
+            if row is None:
+                continue
+            row[count] = total
+            # max() over a coalesce() loses the column type, so SQLite hands back text
+            if isinstance(last, str):
+                last = datetime.date.fromisoformat(last[:10])
+            elif isinstance(last, datetime.datetime):
+                last = last.date()
+            if last and (row['last_used'] is None or last > row['last_used']):
+                row['last_used'] = last
+            row['in_use'] = row['in_use'] or bool(in_use)
+    connection.execute(skill_usage.delete())
+    if rows:
+        connection.execute(skill_usage.insert(), list(rows.values()))
+
+
+def downgrade():
+    # The table itself belongs to the initial schema; it just goes back to being empty
+    op.get_bind().execute(skill_usage.delete())
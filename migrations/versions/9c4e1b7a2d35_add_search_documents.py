@@ -0,0 +1,98 @@
+"""add search documents
+
+Revision ID: 9c4e1b7a2d35
+Revises: 7b3d2f9e1a60
+Create Date: 2026-10-17 13:02:47.551306
+
+"""
+from html.parser import HTMLParser
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e1b7a2d35'
+down_revision = '7b3d2f9e1a60'
+branch_labels = None
+depends_on = None
+
+# The index as of this revision, kept here so later changes to search.py and the models
+# don't alter it
+KIND_SLOTS = 64
+BATCH_SIZE = 500
+blog_posts = sa.table('blog_posts', sa.column('id', sa.Integer), sa.column('title', sa.String),
+                      sa.column('excerpt', sa.Text), sa.column('content', sa.Text),
+                      sa.column('tags', sa.Text), sa.column('status', sa.String))
+projects = sa.table('projects', sa.column('id', sa.Integer), sa.column('title', sa.String),
+                    sa.column('description', sa.Text))
+experiences = sa.table('experiences', sa.column('id', sa.Integer), sa.column('title', sa.String),
+                       sa.column('company', sa.String), sa.column('description', sa.Text))
+achievements = sa.table('achievements', sa.column('id', sa.Integer), sa.column('title', sa.String),
+                        sa.column('description', sa.Text), sa.column('organization', sa.String))
+
+
+class TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def plain_text(html):
+    parser = TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return ' '.join(' '.join(parser.parts).split())
+
+
+def join(*parts):
+    return ' '.join(filter(None, parts))
+
+
+# kind -> (code, query, row -> (title, body)); unpublished posts aren't indexed
+DOCUMENTS = {
+    'blog_post': (1, sa.select(blog_posts).where(blog_posts.c.status == 'published'),
+                  lambda row: (row.title, join(plain_text(row.excerpt) if row.excerpt else None,
+                                               row.content, row.tags))),
+    'project': (2, sa.select(projects), lambda row: (row.title, row.description)),
+    'experience': (3, sa.select(experiences), lambda row: (f'{row.title} - {row.company}', row.description)),
+    'achievement': (4, sa.select(achievements), lambda row: (row.title, join(row.description, row.organization))),
+}
+
+
+def upgrade():
+    connection = op.get_bind()
+    if connection.dialect.name != 'sqlite':
+        return
+    # Writes before this revision may have created the table holding only their own rows
+    op.execute('DROP TABLE IF EXISTS search_documents')
+    op.execute('DROP TABLE IF EXISTS search_index')
+    op.execute("""
+        CREATE VIRTUAL TABLE search_documents USING fts5(
+            kind UNINDEXED, ref_id UNINDEXED, title, body,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("INSERT INTO search_documents (search_documents, rank) VALUES ('rank', 'bm25(0, 0, 10.0, 1.0)')")
+
+    insert = sa.text('INSERT INTO search_documents (rowid, kind, ref_id, title, body) '
+                     'VALUES (:rowid, :kind, :ref_id, :title, :body)')
+    for kind, (code, query, document) in DOCUMENTS.items():
+        batch = []
+        for row in connection.execute(query):
+            title, body = document(row)
+            batch.append({'rowid': row.id * KIND_SLOTS + code, 'kind': kind, 'ref_id': row.id,
+                          'title': title or '', 'body': body or ''})
+            if len(batch) == BATCH_SIZE:
+                connection.execute(insert, batch)
+                batch = []
+        if batch:
+            connection.execute(insert, batch)
+    op.execute("INSERT INTO search_documents (search_documents) VALUES ('optimize')")
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS search_documents')
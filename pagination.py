@@ -0,0 +1,93 @@
+"""
+Keyset pagination
+Cursor-based paging over (sort key DESC, id DESC) so deep pages cost the same as the first
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from flask import current_app, jsonify, request
+from sqlalchemy import tuple_
+
+
+def encode_cursor(value, row_id):
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_column):
+    """Decode a cursor back into (sort value, id); raise ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if value is not None:
+            python_type = sort_column.type.python_type
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def page_size():
+    """Requested ?limit=, clamped to API_MAX_PAGE_SIZE"""
+    max_size = current_app.config.get('API_MAX_PAGE_SIZE', 100)
+    limit = request.args.get('limit')
+    if limit is None:
+        return max_size
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise ValueError('Invalid limit')
+    if limit < 1:
+        raise ValueError('Invalid limit')
+    return min(limit, max_size)
+
+
+def paginate(query, sort_column, id_column):
+    """Return (rows, next_cursor) for the page after ?cursor=, newest first
+
+    Rows with a sort key come first, paged by a (sort key, id) row-value comparison that an
+    index on the sort key serves as a range; once they run out, the rows whose key is NULL
+    follow, paged by id alone.
+    """
+    limit = page_size()
+    cursor = request.args.get('cursor')
+    value, row_id = decode_cursor(cursor, sort_column) if cursor else (None, None)
+    rows = []
+    if not cursor or value is not None:
+        keyed = query.filter(sort_column.isnot(None))
+        if cursor:
+            keyed = keyed.filter(tuple_(sort_column, id_column) < tuple_(value, row_id))
+        rows = keyed.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+        row_id = None  # the NULL run, if reached, starts from its highest id
+    if len(rows) <= limit and sort_column.expression.nullable:
+        tail = query.filter(sort_column.is_(None))
+        if row_id is not None:
+            tail = tail.filter(id_column < row_id)
+        rows += tail.order_by(id_column.desc()).limit(limit + 1 - len(rows)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+def page_response(items, next_cursor):
+    """Wrap a page as {items, next_cursor} when paging was requested
+
+    Plain requests keep the bare-array shape and report truncation via X-Next-Cursor.
+    """
+    if 'cursor' in request.args or 'limit' in request.args:
+        return jsonify({'items': items, 'next_cursor': next_cursor})
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
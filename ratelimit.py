@@ -0,0 +1,133 @@
+"""
+Rate limiting
+Token buckets and a duplicate-suppression window kept in a TTL-evicting in-process store;
+the store is a pluggable backend so a shared one (e.g. Redis) can replace it
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from flask import current_app, jsonify, request
+
+
+def parse_rate(rate):
+    """'5/60' -> (capacity 5, refill 5 tokens per 60 seconds)"""
+    count, seconds = rate.split('/')
+    return int(count), int(count) / float(seconds)
+
+
+class MemoryBackend:
+    """In-process store; entries idle longer than their TTL are evicted oldest-first
+
+    A replacement backend only needs consume(), add() and discard().
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at, ttl)
+        self._keys = OrderedDict()     # key -> expires_at
+        self._lock = Lock()
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        """Take `cost` tokens from the bucket; return (allowed, seconds until allowed)"""
+        now = time.monotonic()
+        ttl = capacity / refill_rate
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.pop(key, (capacity, now, ttl))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now, ttl)
+            self._evict_buckets(now)
+        return allowed, 0 if allowed else (cost - tokens) / refill_rate
+
+    def add(self, key, ttl):
+        """Remember `key` for `ttl` seconds; return False if it was already present"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_keys(now)
+            if key in self._keys:
+                return False
+            self._keys[key] = now + ttl
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._keys.pop(key, None)
+
+    def _evict_buckets(self, now):
+        # A bucket idle for its TTL has refilled completely, so dropping it loses nothing
+        while self._buckets:
+            key, (_, updated_at, ttl) = next(iter(self._buckets.items()))
+            if now - updated_at < ttl and len(self._buckets) <= self.max_entries:
+                break
+            self._buckets.popitem(last=False)
+
+    def _evict_keys(self, now):
+        while self._keys:
+            key, expires_at = next(iter(self._keys.items()))
+            if expires_at > now and len(self._keys) < self.max_entries:
+                break
+            self._keys.popitem(last=False)
+
+
+class RateLimiter:
+    """Per-client rate limits and duplicate suppression
+
+    A `backend` given here is shared by every app; otherwise each app gets its own MemoryBackend.
+    """
+
+    def __init__(self, app=None, backend=None):
+        self.shared_backend = backend
+        self._backends = WeakKeyDictionary()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.extensions['rate_limiter'] = self
+        self._backends[app] = self.shared_backend or MemoryBackend()
+
+    @property
+    def backend(self):
+        return self._backends[current_app._get_current_object()]
+
+    def limit(self, name, per_ip_key, overall_key=None):
+        """Reject requests over the per-client-address rate (and overall rate) with 429
+
+        Rates are read from the named config keys as 'count/seconds', e.g. '5/60'.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                config = current_app.config
+                if config['RATELIMIT_ENABLED']:
+                    allowed, retry_after = self.backend.consume(f'{name}:ip:{request.remote_addr}',
+                                                                *parse_rate(config[per_ip_key]))
+                    if allowed and overall_key and config.get(overall_key):
+                        allowed, retry_after = self.backend.consume(f'{name}:all',
+                                                                    *parse_rate(config[overall_key]))
+                    if not allowed:
+                        response = jsonify({'error': 'Too many requests, please try again later'})
+                        response.status_code = 429
+                        response.headers['Retry-After'] = str(int(retry_after) + 1)
+                        return response
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def first_seen(self, name, values, window):
+        """Return a dedup key if these values weren't seen in the last `window` seconds, else None"""
+        digest = hashlib.blake2b('\x1f'.join(v.strip().lower() for v in values).encode(),
+                                 digest_size=16).hexdigest()
+        key = f'{name}:dup:{digest}'
+        return key if self.backend.add(key, window) else None
+
+    def forget(self, key):
+        """Release a dedup key, e.g. when the submission it guarded was not accepted"""
+        self.backend.discard(key)
@@ -0,0 +1,199 @@
+"""
+Full-text search
+An SQLite FTS5 index over several models, kept in sync by ORM write events
+and queried with BM25 ranking and highlighted snippets
+"""
+
+from html import escape
+
+import click
+from flask import current_app
+from sqlalchemy import column, event, select, table, text
+from sqlalchemy.exc import OperationalError
+
+CREATE_INDEX = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_documents USING fts5(
+    kind UNINDEXED, ref_id UNINDEXED, title, body,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+# Index built before documents were keyed by rowid; replaced (and reindexed) on first use
+LEGACY_TABLE = 'search_index'
+# Each document's rowid is ref_id * KIND_SLOTS + its kind's code, so a write deletes by rowid
+# instead of scanning the UNINDEXED kind/ref_id columns of every document
+KIND_SLOTS = 64
+# Private-use characters FTS5 wraps matches in; swapped for <mark> after the text is escaped
+MARK_OPEN, MARK_CLOSE = '\ue000', '\ue001'
+
+
+def match_expression(query):
+    """Quote each term so user input can't inject FTS5 syntax; the last term matches as a prefix"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def marked_html(text):
+    """Escape highlighted text from FTS5, turning only its match markers into <mark> tags"""
+    return escape(text, quote=False).replace(MARK_OPEN, '<mark>').replace(MARK_CLOSE, '</mark>')
+
+
+class SearchIndex:
+    """Register models that define search_document() -> (title, body) or None to exclude a row
+
+    Each kind also takes a code below KIND_SLOTS that keys its documents; keep it stable.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = db
+        self.models = {}
+        self.codes = {}
+        self._ready = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['search_index'] = self
+        app.cli.add_command(search_cli)
+
+    def register(self, model, kind, code):
+        if not 0 <= code < KIND_SLOTS or code in self.codes.values():
+            raise ValueError(f'Search kind code {code} is out of range or already taken')
+        self.models[kind] = model
+        self.codes[kind] = code
+        for name in ('after_insert', 'after_update'):
+            event.listen(model, name, self._on_save(kind))
+        event.listen(model, 'after_delete', self._on_delete(kind))
+
+    def available(self, connection):
+        return connection.dialect.name == 'sqlite'
+
+    def ensure(self, connection):
+        """Create the index table if needed; return True if it was just created"""
+        key = str(connection.engine.url)
+        if key in self._ready:
+            return False
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'search_documents'")).first()
+        if not exists:
+            connection.execute(text(f'DROP TABLE IF EXISTS {LEGACY_TABLE}'))
+            connection.execute(text(CREATE_INDEX))
+            # Persistent rank function lets FTS5 order by the built-in rank column directly
+            connection.execute(text("INSERT INTO search_documents (search_documents, rank) "
+                                    "VALUES ('rank', 'bm25(0, 0, 10.0, 1.0)')"))
+        self._ready.add(key)
+        return not exists
+
+    def _on_save(self, kind):
+        def listener(mapper, connection, target):
+            if self.available(connection):
+                self.ensure(connection)
+                self._delete(connection, kind, target.id)
+                document = target.search_document()
+                if document:
+                    self._insert(connection, kind, target.id, *document)
+        return listener
+
+    def _on_delete(self, kind):
+        def listener(mapper, connection, target):
+            if self.available(connection):
+                self.ensure(connection)
+                self._delete(connection, kind, target.id)
+        return listener
+
+    def rowid(self, kind, ref_id):
+        return ref_id * KIND_SLOTS + self.codes[kind]
+
+    def _delete(self, connection, kind, ref_id):
+        connection.execute(text('DELETE FROM search_documents WHERE rowid = :rowid'),
+                           {'rowid': self.rowid(kind, ref_id)})
+
+    def _insert(self, connection, kind, ref_id, title, body):
+        connection.execute(text('INSERT INTO search_documents (rowid, kind, ref_id, title, body) '
+                                'VALUES (:rowid, :kind, :ref_id, :title, :body)'),
+                           {'rowid': self.rowid(kind, ref_id), 'kind': kind, 'ref_id': ref_id,
+                            'title': title or '', 'body': body or ''})
+
+    def reindex(self, batch_size=500):
+        """Rebuild the whole index from the registered models; return the row count"""
+        connection = self.db.session.connection()
+        self._ready.discard(str(connection.engine.url))
+        connection.execute(text('DROP TABLE IF EXISTS search_documents'))
+        self.ensure(connection)
+        count = 0
+        for kind, model in self.models.items():
+            for row in model.query.yield_per(batch_size):
+                document = row.search_document()
+                if document:
+                    self._insert(connection, kind, row.id, *document)
+                    count += 1
+        connection.execute(text("INSERT INTO search_documents (search_documents) VALUES ('optimize')"))
+        self.db.session.commit()
+        return count
+
+    def backfill(self, batch_size=500):
+        """Index rows that have no document yet, e.g. written before the index existed; commit to apply
+
+        Returns how many documents were added. Rows without one are re-checked every time, but
+        those are only the ones search_document() excludes.
+        """
+        connection = self.db.session.connection()
+        self.ensure(connection)
+        documents = table('search_documents', column('rowid'))
+        count = 0
+        for kind, model in self.models.items():
+            missing = (model.id * KIND_SLOTS + self.codes[kind]).not_in(select(documents.c.rowid))
+            for row in model.query.filter(missing).yield_per(batch_size):
+                document = row.search_document()
+                if document:
+                    self._insert(connection, kind, row.id, *document)
+                    count += 1
+        return count
+
+    def search(self, query, kinds=None, limit=20):
+        """Return BM25-ranked hits (title weighted 10x body) with <mark>-highlighted snippets
+
+        Titles and snippets are HTML: the indexed text is escaped and only matches are marked up.
+
+        Returns no hits on databases without FTS5 or before the index exists.
+        """
+        expression = match_expression(query)
+        connection = self.db.session.connection()
+        if not expression or not self.available(connection):
+            return []
+        sql = ("SELECT kind, ref_id, highlight(search_documents, 2, :open, :close) AS title, "
+               "snippet(search_documents, 3, :open, :close, '…', 16) AS snippet, "
+               "rank AS score "
+               "FROM search_documents WHERE search_documents MATCH :q")
+        params = {'q': expression, 'limit': limit, 'open': MARK_OPEN, 'close': MARK_CLOSE}
+        if kinds:
+            placeholders = ', '.join(f':kind{i}' for i in range(len(kinds)))
+            sql += f' AND kind IN ({placeholders})'
+            params.update({f'kind{i}': kind for i, kind in enumerate(kinds)})
+        sql += ' ORDER BY rank LIMIT :limit'
+        try:
+            rows = connection.execute(text(sql), params).all()
+        except OperationalError as e:
+            if 'no such table' in str(e):
+                return []
+            raise
+        return [{
+            'type': row.kind,
+            'id': row.ref_id,
+            'title': marked_html(row.title),
+            'snippet': marked_html(row.snippet),
+            'score': round(-row.score, 4)
+        } for row in rows]
+
+
+@click.group('search')
+def search_cli():
+    """Manage the full-text search index."""
+
+
+@search_cli.command('reindex')
+def reindex_command():
+    """Rebuild the search index from the database."""
+    count = current_app.extensions['search_index'].reindex()
+    click.echo(f'Indexed {count} documents')
@@ -0,0 +1,271 @@
+"""
+Compiled JSON serialization
+Per-model encoders generated once from the column list that turn SQLAlchemy Core rows
+straight into JSON text, byte-for-byte what jsonify() produces for the model's to_dict()
+"""
+
+import asyncio
+import datetime
+import decimal
+from json.encoder import encode_basestring_ascii
+from weakref import WeakKeyDictionary
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String, select
+
+from database import in_chunks
+
+try:
+    import orjson
+except ImportError:  # Optional - the stdlib C string encoder is used without it
+    orjson = None
+
+
+def _string(value):
+    return 'null' if value is None else encode_basestring_ascii(value)
+
+
+def _orjson_string(value):
+    if value is None:
+        return 'null'
+    # orjson writes UTF-8 and leaves DEL unescaped; jsonify() escapes both (DEL as \u007f), so
+    # those strings take the stdlib path
+    if value.isascii() and '\x7f' not in value:
+        return orjson.dumps(value).decode()
+    return encode_basestring_ascii(value)
+
+
+def _integer(value):
+    return 'null' if value is None else int.__repr__(value)
+
+
+def _boolean(value):
+    return 'null' if value is None else ('true' if value else 'false')
+
+
+def _float(value):
+    return 'null' if value is None else float.__repr__(float(value))
+
+
+def _isoformat(value):
+    return 'null' if value is None else '"' + value.isoformat() + '"'
+
+
+def _any(value, string=_string):
+    """Encode a converted value whose type isn't known from the column"""
+    if value is None or isinstance(value, str):
+        return string(value)
+    if isinstance(value, bool):
+        return _boolean(value)
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        return float.__repr__(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return _isoformat(value)
+    if isinstance(value, decimal.Decimal):
+        return encode_basestring_ascii(str(value))
+    raise TypeError(f'Cannot encode {type(value).__name__}')
+
+
+def _column_encoder(column, string):
+    if isinstance(column.type, Boolean):
+        return _boolean
+    if isinstance(column.type, (Date, DateTime)):
+        return _isoformat
+    if isinstance(column.type, Integer):
+        return _integer
+    if isinstance(column.type, Float):
+        return _float
+    if isinstance(column.type, String):
+        return string
+    return lambda value: _any(value, string)
+
+
+class Encoder:
+    """Row -> JSON object text for one model, with sorted keys and nested fragments"""
+
+    def __init__(self, model, exclude=(), convert=None, one=None, many=None, string=_string):
+        self.model = model
+        self.table = model.__table__
+        self.columns = list(self.table.columns)
+        self.one = one or {}
+        self.many = many or {}
+        position = {column.name: i for i, column in enumerate(self.columns)}
+        self.pk = position[self.table.primary_key.columns.values()[0].name]
+        self.fk = {key: position[fk] for key, (_, fk) in self.one.items()}
+
+        namespace = {}
+        fields = []
+        for column in self.columns:
+            if column.name in exclude:
+                continue
+            if convert and column.name in convert:
+                namespace[f'c_{column.name}'] = convert[column.name]
+                namespace[f'e_{column.name}'] = lambda value, string=string: _any(value, string)
+                fields.append((column.name, f'e_{column.name}(c_{column.name}(row[{position[column.name]}]))'))
+            else:
+                namespace[f'e_{column.name}'] = _column_encoder(column, string)
+                fields.append((column.name, f'e_{column.name}(row[{position[column.name]}])'))
+        nested = sorted(self.one) + sorted(self.many)
+        for i, key in enumerate(nested):
+            if key in self.one:
+                fields.append((key, f"nested[{i}].get(row[{self.fk[key]}], 'null')"))
+            else:
+                fields.append((key, f"nested[{i}].get(row[{self.pk}], '[]')"))
+        self.nested = nested
+
+        parts = []
+        for i, (key, expression) in enumerate(sorted(fields)):
+            parts.append(repr(('{' if i == 0 else ',') + encode_basestring_ascii(key) + ':'))
+            parts.append(expression)
+        source = 'def encode(row, nested):\n    return ' + ' + '.join(parts or ["'{'"]) + " + '}'\n"
+        exec(source, namespace)
+        self.encode = namespace['encode']
+
+
+class Serializer:
+    """Register models with their to_dict() shape, then encode Core selects of them
+
+    one={'user': (User, 'user_id')} nests a related object by foreign key;
+    many={'technologies': (Skill, project_skills)} nests a list through an association table.
+    Fragments of nested models are cached until their table version changes.
+    """
+
+    def __init__(self, app=None, db=None, versions=None):
+        self.db = db
+        self.versions = versions
+        self.encoders = {}
+        self.targets = set()
+        self.string = _string  # until init_app() applies SERIALIZER_BACKEND
+        self._specs = {}
+        self._fragments = WeakKeyDictionary()  # app -> {model: (version, {id: fragment})}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SERIALIZER_BACKEND', 'auto')
+        # Encoders are shared by every app; both backends produce the same bytes
+        self.use(app.config['SERIALIZER_BACKEND'])
+        app.extensions['serializer'] = self
+
+    def use(self, backend):
+        """Pick the string encoder: 'orjson', 'json' (stdlib), or 'auto' for orjson when installed"""
+        self.string = _orjson_string if orjson is not None and backend in ('auto', 'orjson') else _string
+        self._fragments.clear()
+        for model, spec in self._specs.items():
+            self.encoders[model] = Encoder(model, *spec, string=self.string)
+
+    @property
+    def compatible(self):
+        """True when app.json produces compact, sorted, ASCII output this engine reproduces"""
+        provider = current_app.json
+        return (type(provider) is DefaultJSONProvider and provider.sort_keys and provider.ensure_ascii
+                and (provider.compact or (provider.compact is None and not current_app.debug)))
+
+    def register(self, model, exclude=(), convert=None, one=None, many=None):
+        self._specs[model] = (exclude, convert, one, many)
+        self.encoders[model] = Encoder(model, exclude, convert, one, many, self.string)
+        self.targets.update(target for target, _ in list((one or {}).values()) + list((many or {}).values()))
+
+    def select(self, model):
+        """A Core select of every column of `model`, to refine with where/order_by/limit"""
+        return select(*model.__table__.columns)
+
+    def encode(self, model, statement):
+        """Run `statement` (from select()) and return one JSON fragment per row"""
+        return self.encode_rows(model, self.db.session.execute(statement).all())
+
+    def encode_rows(self, model, rows):
+        encoder = self.encoders[model]
+        nested = []
+        for key in encoder.nested:
+            if key in encoder.one:
+                target, _ = encoder.one[key]
+                nested.append(self.fragments(target, {row[encoder.fk[key]] for row in rows}))
+            else:
+                target, link = encoder.many[key]
+                pairs = []
+                for statement in self._link_selects(encoder.table, target, link, [row[encoder.pk] for row in rows]):
+                    pairs += self.db.session.execute(statement).all()
+                nested.append(_lists(pairs, self.fragments(target, {target_id for _, target_id in pairs})))
+        return self._prime(model, rows, [encoder.encode(row, nested) for row in rows])
+
+    async def encode_async(self, model, rows, fetch):
+        """encode_rows() with nested lookups awaited concurrently through `fetch(statement) -> rows`"""
+        encoder = self.encoders[model]
+
+        async def lookup(key):
+            if key in encoder.one:
+                target, _ = encoder.one[key]
+                return await self.fragments_async(target, {row[encoder.fk[key]] for row in rows}, fetch)
+            target, link = encoder.many[key]
+            results = await asyncio.gather(*map(fetch, self._link_selects(
+                encoder.table, target, link, [row[encoder.pk] for row in rows])))
+            pairs = [pair for result in results for pair in result]
+            return _lists(pairs, await self.fragments_async(target, {target_id for _, target_id in pairs}, fetch))
+
+        nested = await asyncio.gather(*map(lookup, encoder.nested))
+        return self._prime(model, rows, [encoder.encode(row, nested) for row in rows])
+
+    def _prime(self, model, rows, fragments):
+        if model in self.targets:
+            # e.g. the full skills list primes the fragments nested in projects and experiences
+            pk = self.encoders[model].pk
+            self._cache(model).update((row[pk], fragment) for row, fragment in zip(rows, fragments))
+        return fragments
+
+    def _cache(self, model):
+        version = self.versions.get((model.__tablename__,)) if self.versions else None
+        fragments = self._fragments.setdefault(current_app._get_current_object(), {})
+        cached_version, cache = fragments.get(model, (None, {}))
+        if cached_version != version:
+            cache = {}
+            fragments[model] = (version, cache)
+        return cache
+
+    def _missing_selects(self, model, cache, ids):
+        pk = model.__table__.primary_key.columns.values()[0]
+        missing = [i for i in ids if i is not None and i not in cache]
+        return [self.select(model).where(pk.in_(chunk)) for chunk in in_chunks(missing)]
+
+    def fragments(self, model, ids):
+        """Encoded fragments for the given primary keys, served from the per-model cache"""
+        cache = self._cache(model)
+        for statement in self._missing_selects(model, cache, ids):
+            self.encode_rows(model, self.db.session.execute(statement).all())  # fills the cache
+        return cache
+
+    async def fragments_async(self, model, ids, fetch):
+        cache = self._cache(model)
+        for rows in await asyncio.gather(*map(fetch, self._missing_selects(model, cache, ids))):
+            await self.encode_async(model, rows, fetch)
+        return cache
+
+    def _link_selects(self, owner_table, target, link, owner_ids):
+        """Link rows through `link`, joined the way selectinload() does so the order matches"""
+        target_pk = target.__table__.primary_key.columns.values()[0]
+        owner_column = next(c for c in link.columns if c.references(owner_table.primary_key.columns.values()[0]))
+        target_column = next(c for c in link.columns if c.references(target_pk))
+        return [select(owner_column, target_column)
+                .select_from(link.join(target.__table__, target_pk == target_column))
+                .where(owner_column.in_(chunk)) for chunk in in_chunks(owner_ids)]
+
+    @staticmethod
+    def array(fragments):
+        return '[' + ','.join(fragments) + ']'
+
+    @staticmethod
+    def document(sections):
+        """Assemble {key: fragment} into the response body jsonify() would produce"""
+        return ('{' + ','.join(encode_basestring_ascii(key) + ':' + sections[key]
+                               for key in sorted(sections)) + '}\n').encode('ascii')
+
+
+def _lists(pairs, fragments):
+    """{owner id: '[fragment,...]'} from ordered (owner id, target id) pairs"""
+    grouped = {}
+    for owner_id, target_id in pairs:
+        grouped.setdefault(owner_id, []).append(fragments[target_id])
+    return {owner_id: '[' + ','.join(items) + ']' for owner_id, items in grouped.items()}
@@ -0,0 +1,220 @@
+"""
+Portfolio snapshot
+A pre-serialized (and pre-compressed) document rebuilt when its source tables change
+and persisted to the instance folder so it survives restarts
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from threading import Lock
+
+import click
+from flask import Response, current_app, request
+from sqlalchemy import func, select
+from werkzeug.http import generate_etag
+
+try:
+    import brotli
+except ImportError:  # Optional - only needed for br-encoded snapshots
+    brotli = None
+
+
+class Snapshot:
+    """One prebuilt JSON document; fresh while its table versions are unchanged
+
+    The persisted copy is adopted on first use only if its validator (the tables' stamps
+    and row fingerprints when it was built) still matches the database.
+    """
+
+    def __init__(self, app=None, db=None, build=None, cache=None, models=(), name='portfolio',
+                 serialize=None):
+        self.db = db
+        self.name = name
+        self.build = build
+        self.serialize = serialize
+        self._cache = cache
+        self.versions = cache.versions
+        self.tables = tuple(model.__tablename__ for model in models)
+        self._sources = [model.__table__ for model in models]
+        self._states = {}  # path -> (version, built_at, etag, {encoding: body}), one per app's folder
+        self._loaded = set()  # paths whose persisted copy was already considered
+        self._lock = Lock()
+        cache.commit_listeners.append(self._on_commit)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['snapshot'] = self
+        app.cli.add_command(snapshot_cli)
+
+    @property
+    def path(self):
+        """The current app's persisted copy, in SNAPSHOT_FOLDER (default: the instance folder)"""
+        folder = current_app.config.get('SNAPSHOT_FOLDER') or current_app.instance_path
+        return os.path.join(folder, f'{self.name}_snapshot.json')
+
+    def _on_commit(self, tables):
+        # Drop the persisted copy so a restart after a write (from any process) rebuilds it
+        if not self.tables or tables.intersection(self.tables):
+            self._unlink()
+
+    def invalidate(self):
+        """Forget the current snapshot so the next read rebuilds it"""
+        self._states.pop(self.path, None)
+        self._unlink()
+
+    def _unlink(self):
+        for suffix in ('', '.gz', '.br', '.meta'):
+            try:
+                os.remove(self.path + suffix)
+            except OSError:
+                pass
+
+    def _encode(self, body):
+        encoded = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            encoded['br'] = brotli.compress(body)
+        return encoded
+
+    def validator(self):
+        """What the data looked like: each table's stamp, row count, max id and max updated_at
+
+        Stamps catch writes made through the app by any process; the fingerprints catch rows
+        added, removed or touched by anything else.
+        """
+        columns = []
+        for table in self._sources:
+            keys = [func.count(), func.max(table.primary_key.columns.values()[0])]
+            if 'updated_at' in table.c:
+                keys.append(func.max(table.c.updated_at))
+            columns += [select(key).select_from(table).scalar_subquery() for key in keys]
+        rows = self.db.session.execute(select(*columns)).one()
+        validator = {'stamps': self.versions.stamps(self.tables), 'rows': list(rows)}
+        return json.loads(json.dumps(validator, default=str))
+
+    def load(self):
+        """Adopt the persisted snapshot as fresh for the current versions if it is still valid"""
+        version = self.versions.get(self.tables)
+        try:
+            with open(self.path, 'rb') as f:
+                body = f.read()
+            with open(self.path + '.meta') as f:
+                meta = json.load(f)
+            built_at = datetime.fromtimestamp(int(os.path.getmtime(self.path)), timezone.utc)
+        except (OSError, ValueError):
+            return False
+        etag = generate_etag(body)
+        # The etag pairs the validator with this body, in case another process replaced one of them
+        if meta.get('etag') != etag or meta.get('validator') != self.validator():
+            return False
+        self._states[self.path] = (version, built_at, etag, self._encode(body))
+        return True
+
+    def render(self):
+        """Serialize a live build, through the fast `serialize` callable when one is given"""
+        if self.serialize is not None:
+            body = self.serialize()
+            if body is not None:
+                return body
+        return self.jsonify()
+
+    def jsonify(self):
+        """Serialize build() exactly as jsonify() would"""
+        return current_app.json.response(self.build()).get_data()
+
+    def rebuild(self, stale_only=False):
+        """Build, persist and adopt the snapshot; with `stale_only`, keep a current one instead"""
+        with self._lock:
+            version = self.versions.get(self.tables)
+            state = self._states.get(self.path)
+            # Readers that saw the same write all queue here; only the first needs to build
+            if stale_only and state is not None and state[0] == version:
+                return state
+            # Taken before the build, so a write during it leaves the persisted copy invalid
+            validator = self.validator()
+            body = self.render()
+            encoded = self._encode(body)
+            etag = generate_etag(body)
+            self._persist(encoded, {'etag': etag, 'validator': validator})
+            built_at = datetime.now(timezone.utc).replace(microsecond=0)
+            state = self._states[self.path] = (version, built_at, etag, encoded)
+            return state
+
+    def _persist(self, encoded, meta):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        suffixes = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+        for encoding, data in encoded.items():
+            target = self.path + suffixes[encoding]
+            # Per process: pre-forked workers may rebuild at the same time (the lock is per process)
+            tmp = f'{target}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, target)
+        tmp = f'{self.path}.meta.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.path + '.meta')
+
+    def current(self):
+        path = self.path
+        state = self._states.get(path)
+        if state is None and path not in self._loaded:
+            # Adopted here rather than in init_app(), which must not touch the database
+            self._loaded.add(path)
+            if self.load():
+                state = self._states[path]
+        if state is None or state[0] != self.versions.get(self.tables):
+            state = self.rebuild(stale_only=True)
+        return state
+
+    def body(self):
+        """The current serialized document (uncompressed bytes)"""
+        return self.current()[3]['identity']
+
+    def response(self):
+        """Serve the snapshot, pre-compressed when the client accepts it; no queries when fresh"""
+        _, built_at, etag, encoded = self.current()
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in encoded and candidate in request.accept_encodings:
+                encoding = candidate
+                break
+        response = Response(encoded[encoding], mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+            etag = f'{etag}-{encoding}'
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        response.last_modified = built_at
+        return response.make_conditional(request)
+
+    def check(self):
+        """Return True if the served snapshot matches a live jsonify() of build()"""
+        return self.current()[3]['identity'] == self.jsonify()
+
+
+@click.group('snapshot')
+def snapshot_cli():
+    """Manage the prebuilt portfolio snapshot."""
+
+
+@snapshot_cli.command('rebuild')
+def rebuild_command():
+    """Rebuild and persist the snapshot."""
+    snapshot = current_app.extensions['snapshot']
+    _, _, etag, encoded = snapshot.rebuild()
+    click.echo(f'Rebuilt {snapshot.path} ({len(encoded["identity"])} bytes, etag {etag})')
+
+
+@snapshot_cli.command('check')
+def check_command():
+    """Compare the persisted snapshot against a live build."""
+    snapshot = current_app.extensions['snapshot']
+    if not snapshot.load():
+        raise click.ClickException('No snapshot found, or the data changed since it was built; '
+                                   'run "flask snapshot rebuild"')
+    if not snapshot.check():
+        raise click.ClickException('Snapshot is stale; run "flask snapshot rebuild"')
+    click.echo('Snapshot matches live data')
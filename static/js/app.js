@@ -31,14 +31,19 @@ async function initApp() {
     setupAvatar();
 }
 
-// Load portfolio data from Flask API
+// Load portfolio data from the server-rendered bootstrap, falling back to the Flask API
 async function loadPortfolioData() {
     try {
-        const response = await fetch('/api/portfolio/');
-        if (!response.ok) {
-            throw new Error('Failed to load portfolio data');
+        const bootstrap = document.getElementById('portfolio-data');
+        if (bootstrap) {
+            portfolioData = JSON.parse(bootstrap.textContent);
+        } else {
+            const response = await fetch('/api/portfolio/');
+            if (!response.ok) {
+                throw new Error('Failed to load portfolio data');
+            }
+            portfolioData = await response.json();
         }
-        portfolioData = await response.json();
         
         // Render data to UI
         renderPortfolioData();
@@ -0,0 +1,44 @@
+"""
+Streaming responses
+Emit large collections as a chunked JSON array or NDJSON while iterating rows in batches
+"""
+
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON = 'application/x-ndjson'
+
+
+def wants_ndjson():
+    return request.accept_mimetypes.best_match(['application/json', NDJSON]) == NDJSON \
+        and request.accept_mimetypes[NDJSON] > request.accept_mimetypes['application/json']
+
+
+def streaming_requested():
+    """True for ?stream=1 or an Accept header preferring NDJSON"""
+    return request.args.get('stream') in ('1', 'true') or wants_ndjson()
+
+
+def stream_query(query, serialize):
+    """Stream every row of `query` without materializing the full result
+
+    Rows are fetched with yield_per(STREAM_BATCH_SIZE) and encoded one at a
+    time, so peak memory is bounded by the batch size, not the table size.
+    """
+    batch_size = current_app.config.get('STREAM_BATCH_SIZE', 100)
+    dumps = current_app.json.dumps
+    ndjson = wants_ndjson()
+
+    def generate():
+        rows = query.yield_per(batch_size)
+        if ndjson:
+            for row in rows:
+                yield dumps(serialize(row)) + '\n'
+            return
+        first = True
+        yield '['
+        for row in rows:
+            yield ('' if first else ',') + dumps(serialize(row))
+            first = False
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON if ndjson else 'application/json')
@@ -0,0 +1,169 @@
+"""
+Blog tags
+Normalizes each post's comma-separated tags into a tag table and a link table, keeping
+per-tag post counts current by recounting only the tags touched in each flush
+"""
+
+import re
+
+import click
+from flask import current_app
+from sqlalchemy import Column, bindparam, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.orm.base import NO_VALUE
+from sqlalchemy.sql.visitors import iterate
+
+from cache import mark_written
+from database import in_chunks
+
+
+def slugify(name):
+    """'Cloud Security' -> 'cloud-security'; Unicode letters are kept"""
+    return re.sub(r'[\W_]+', '-', name.lower()).strip('-')
+
+
+def parse_tags(value):
+    """'Python, cloud security,python' -> {'python': 'Python', 'cloud-security': 'cloud security'}"""
+    tags = {}
+    for part in (value or '').split(','):
+        name = ' '.join(part.split())
+        slug = slugify(name)
+        if slug and slug not in tags:
+            tags[slug] = name
+    return tags
+
+
+class TagIndex:
+    """Maintain `tag` rows and `link` (post_id, tag_id) rows from `model`'s `source` column
+
+    A tag's post_count is the number of linked posts matching `counted`, e.g. published ones.
+    """
+
+    def __init__(self, app=None, db=None, model=None, tag=None, link=None, source='tags', counted=None):
+        self.db = db
+        self.model = model
+        self.tag = tag
+        self.link = link
+        self.source = source
+        self.counted = counted
+        # Attributes whose change can move a post in or out of the counts
+        self.counted_keys = {element.key for element in iterate(counted) if isinstance(element, Column)} \
+            if counted is not None else set()
+        self.post_column = next(c for c in link.columns if c.references(model.__table__.c.id))
+        self.tag_column = next(c for c in link.columns if c.references(tag.__table__.c.id))
+        # db.session outlives any one app, so init_app() must not listen again
+        event.listen(db.session, 'after_flush', self._after_flush)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['tags'] = self
+        app.cli.add_command(tags_cli)
+
+    def _after_flush(self, session, flush_context):
+        relink, recount, removed, removed_slugs = {}, set(), set(), set()
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, self.model):
+                continue
+            if obj in session.new or get_history(obj, self.source).has_changes():
+                relink[obj.id] = getattr(obj, self.source)
+            elif any(get_history(obj, key).has_changes() for key in self.counted_keys):
+                recount.add(obj.id)
+        for obj in session.deleted:
+            if isinstance(obj, self.model):
+                removed.add(obj.id)
+                # Where the database cascades the delete, the link rows are already gone
+                value = inspect(obj).attrs[self.source].loaded_value
+                if value is not NO_VALUE:
+                    removed_slugs.update(parse_tags(value))
+        if relink or recount or removed:
+            connection = session.connection()
+            affected = self._linked(connection, recount)
+            affected |= set(self._existing(connection, removed_slugs).values())
+            affected |= self._unlink(connection, removed | set(relink))
+            affected |= self._link(connection, relink)
+            self.refresh(connection, affected)
+
+    def _linked(self, connection, post_ids):
+        tag_ids = set()
+        for chunk in in_chunks(sorted(post_ids)):
+            tag_ids.update(connection.execute(select(self.tag_column)
+                                              .where(self.post_column.in_(chunk))).scalars())
+        return tag_ids
+
+    def _unlink(self, connection, post_ids):
+        tag_ids = self._linked(connection, post_ids)
+        for chunk in in_chunks(sorted(post_ids)):
+            connection.execute(delete(self.link).where(self.post_column.in_(chunk)))
+        return tag_ids
+
+    def _link(self, connection, sources):
+        """Link each post id to the tags parsed from its source value; return the tag ids used"""
+        parsed = {post_id: parse_tags(value) for post_id, value in sources.items()}
+        names = {}
+        for tags in parsed.values():
+            for slug, name in tags.items():
+                names.setdefault(slug, name)
+        ids = self._tag_ids(connection, names)
+        rows = [{self.post_column.name: post_id, self.tag_column.name: ids[slug]}
+                for post_id, tags in parsed.items() for slug in tags]
+        if rows:
+            connection.execute(insert(self.link), rows)
+        return set(ids.values())
+
+    def _existing(self, connection, slugs):
+        table = self.tag.__table__
+        ids = {}
+        for chunk in in_chunks(sorted(slugs)):
+            ids.update(connection.execute(select(table.c.slug, table.c.id)
+                                          .where(table.c.slug.in_(chunk))).all())
+        return ids
+
+    def _tag_ids(self, connection, names):
+        """{slug: name} -> {slug: tag id}, creating the tags that don't exist yet"""
+        ids = self._existing(connection, names)
+        missing = [{'slug': slug, 'name': names[slug], 'post_count': 0} for slug in names if slug not in ids]
+        if missing:
+            connection.execute(insert(self.tag.__table__), missing)
+            ids.update(self._existing(connection, [row['slug'] for row in missing]))
+        return ids
+
+    def refresh(self, connection, tag_ids):
+        """Recount `tag_ids` with one grouped, indexed query per chunk"""
+        table = self.tag.__table__
+        for chunk in in_chunks(sorted(tag_ids)):
+            posts = self.model.__table__
+            query = select(self.tag_column, func.count())\
+                .select_from(self.link.join(posts, self.post_column == posts.c.id))\
+                .where(self.tag_column.in_(chunk)).group_by(self.tag_column)
+            if self.counted is not None:
+                query = query.where(self.counted)
+            counts = dict(connection.execute(query).all())
+            connection.execute(update(table).where(table.c.id == bindparam('tag_id')),
+                               [{'tag_id': tag_id, 'post_count': counts.get(tag_id, 0)} for tag_id in chunk])
+
+    def rebuild(self):
+        """Relink every post from its source column; needed after bulk inserts. Commit to apply"""
+        connection = self.db.session.connection()
+        table = self.model.__table__
+        mark_written(self.db.session, self.tag.__tablename__, self.link.name)
+        connection.execute(delete(self.link))
+        sources = dict(connection.execute(select(table.c.id, table.c[self.source])
+                                          .where(table.c[self.source].isnot(None))).all())
+        self._link(connection, sources)
+        self.refresh(connection, connection.execute(select(self.tag.__table__.c.id)).scalars().all())
+        return len(sources)
+
+
+@click.group('tags')
+def tags_cli():
+    """Manage blog tags."""
+
+
+@tags_cli.command('rebuild')
+def rebuild_command():
+    """Rebuild tags, post links and counts from the posts' tags column."""
+    index = current_app.extensions['tags']
+    count = index.rebuild()
+    index.db.session.commit()
+    click.echo(f'Relinked tags for {count} posts')
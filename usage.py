@@ -0,0 +1,131 @@
+"""
+Skill usage
+A per-skill aggregate (project/experience counts, last use, in-use flag) kept current by
+recomputing only the skills whose links changed in each flush
+"""
+
+import datetime
+
+import click
+from flask import current_app
+from sqlalchemy import case, delete, event, func, insert, inspect, select
+from sqlalchemy.orm.attributes import PASSIVE_NO_INITIALIZE, get_history
+
+from cache import mark_written
+from database import in_chunks
+
+
+class UsageIndex:
+    """Maintain `model` (one row per `target` row) from the tracked association relationships"""
+
+    def __init__(self, app=None, db=None, model=None, target=None):
+        self.db = db
+        self.model = model
+        self.target = target
+        self.tracked = []
+        # Listened to here rather than in init_app(): db.session is shared by every app
+        event.listen(db.session, 'after_flush', self._after_flush)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['skill_usage'] = self
+        app.cli.add_command(usage_cli)
+
+    def track(self, relationship, count, used, current=None):
+        """Count links through `relationship` (e.g. Project.technologies) into the `count` column
+
+        `used` is the owner's date of use; `current` an optional owner flag meaning "still in use".
+        """
+        owner = relationship.class_
+        link = relationship.property.secondary
+        owner_pk = inspect(owner).primary_key[0]
+        target_pk = inspect(self.target).primary_key[0]
+        self.tracked.append({
+            'owner': owner, 'key': relationship.key, 'link': link, 'count': count,
+            'used': used, 'current': current,
+            'owner_column': next(c for c in link.columns if c.references(owner_pk)),
+            'target_column': next(c for c in link.columns if c.references(target_pk)),
+            'owner_pk': owner_pk,
+        })
+
+    def _after_flush(self, session, flush_context):
+        affected = set()
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, self.target):
+                affected.add(obj.id)
+        connection = None
+        for spec in self.tracked:
+            owner_ids = set()
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                if not isinstance(obj, spec['owner']):
+                    continue
+                # Links added or removed in this flush, plus the ones it deleted with the owner
+                history = get_history(obj, spec['key'], passive=PASSIVE_NO_INITIALIZE)
+                affected.update(skill.id for skill in history.sum())
+                if obj not in session.deleted:
+                    owner_ids.add(obj.id)
+            if owner_ids:
+                # Unloaded collections didn't change, but the owner's date or flag may have
+                connection = connection or session.connection()
+                for chunk in in_chunks(sorted(owner_ids)):
+                    affected.update(connection.execute(select(spec['target_column'])
+                                                       .where(spec['owner_column'].in_(chunk))).scalars())
+        if affected:
+            self.refresh(connection or session.connection(), affected)
+
+    def refresh(self, connection, target_ids):
+        """Recompute the rows for `target_ids`; ids that no longer exist lose their row"""
+        table = self.model.__table__
+        key = table.primary_key.columns.values()[0]
+        target_pk = inspect(self.target).primary_key[0]
+        for chunk in in_chunks(sorted(i for i in target_ids if i is not None)):
+            existing = connection.execute(select(target_pk).where(target_pk.in_(chunk))).scalars()
+            rows = {target_id: self._empty_row(key.name, target_id) for target_id in existing}
+            for spec in self.tracked:
+                current = func.max(case((spec['current'], 1), else_=0)) if spec['current'] is not None \
+                    else func.max(0)
+                query = select(spec['target_column'], func.count(), func.max(spec['used']), current)\
+                    .select_from(spec['link'].join(spec['owner'].__table__,
+                                                   spec['owner_pk'] == spec['owner_column']))\
+                    .where(spec['target_column'].in_(chunk))\
+                    .group_by(spec['target_column'])
+                for target_id, count, used, in_use in connection.execute(query):
+                    row = rows.get(target_id)
+                    if row is None:
+                        continue
+                    row[spec['count']] = count
+                    used = used.date() if isinstance(used, datetime.datetime) else used
+                    if used and (row['last_used'] is None or used > row['last_used']):
+                        row['last_used'] = used
+                    row['in_use'] = row['in_use'] or bool(in_use)
+            connection.execute(delete(table).where(key.in_(chunk)))
+            if rows:
+                connection.execute(insert(table), list(rows.values()))
+
+    def _empty_row(self, key, target_id):
+        row = {key: target_id, 'last_used': None, 'in_use': False}
+        row.update((spec['count'], 0) for spec in self.tracked)
+        return row
+
+    def rebuild(self):
+        """Recompute every row; needed after bulk inserts that bypass the ORM"""
+        connection = self.db.session.connection()
+        mark_written(self.db.session, self.model.__tablename__)
+        connection.execute(delete(self.model.__table__))
+        ids = connection.execute(select(inspect(self.target).primary_key[0])).scalars().all()
+        self.refresh(connection, ids)
+        self.db.session.commit()
+        return len(ids)
+
+
+@click.group('usage')
+def usage_cli():
+    """Manage the skill usage aggregate."""
+
+
+@usage_cli.command('rebuild')
+def rebuild_command():
+    """Recompute skill usage from the association tables."""
+    count = current_app.extensions['skill_usage'].rebuild()
+    click.echo(f'Rebuilt usage for {count} skills')